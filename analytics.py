@@ -0,0 +1,163 @@
+import os
+from itertools import chain
+
+import numpy as np
+
+from quiz_engine import TABLE_SIZE
+
+
+# Latency histogram bin edges in ms; bin i covers [BIN_LOW[i], BIN_HIGH[i])
+LATENCY_EDGES = np.geomspace(200, 60000, 47)
+BIN_LOW = np.append(0, LATENCY_EDGES)
+BIN_HIGH = np.append(LATENCY_EDGES, LATENCY_EDGES[-1])
+MIN_TREND_ATTEMPTS = 3
+
+
+class MasteryStats:
+    """Per-fact mastery aggregates over the whole answer history.
+
+    Everything is kept as running sums indexed by fact, so a session's answers
+    are folded in with a few vectorized bincounts instead of recomputing from
+    scratch: attempts, correct answers, latency sum, a latency histogram (for
+    percentiles) and the least-squares sums of correctness against attempt
+    number (for the trend).
+    """
+
+    SUMS = ("attempts", "correct", "latency_sum", "sum_x", "sum_xx", "sum_xy")
+
+    def __init__(self, size=TABLE_SIZE):
+        self.size = 0
+        self.last_rowid = 0  # newest history row folded in
+        for name in self.SUMS:
+            setattr(self, name, np.zeros(0))
+        self.histogram = np.zeros((0, len(BIN_LOW)))
+        self.resize(size)
+
+    def resize(self, size):
+        if size <= self.size:
+            return
+        for name in self.SUMS:
+            grown = np.zeros((size, size))
+            grown[:self.size, :self.size] = getattr(self, name).reshape(self.size, self.size)
+            setattr(self, name, grown.ravel())
+        grown = np.zeros((size, size, len(BIN_LOW)))
+        grown[:self.size, :self.size] = self.histogram.reshape(self.size, self.size, len(BIN_LOW))
+        self.histogram = grown.reshape(size * size, len(BIN_LOW))
+        self.size = size
+
+    # ---------------- Updates ----------------
+    def update(self, a, b, correct, latency_ms):
+        """Fold answers (equal-length arrays, oldest first) into the aggregates."""
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        if not len(a):
+            return
+        correct = np.asarray(correct, dtype=np.float64)
+        latency_ms = np.asarray(latency_ms, dtype=np.float64)
+        self.resize(int(max(a.max(), b.max())))
+
+        facts = (a - 1) * self.size + (b - 1)
+        cells = self.size * self.size
+
+        # Attempt number of each answer within its fact, continuing from history;
+        # 16-bit keys let the stable sort use radix sort
+        keys = facts.astype(np.uint16) if cells <= 1 << 16 else facts
+        order = np.argsort(keys, kind="stable")
+        sorted_facts = facts[order]
+        starts = np.flatnonzero(np.r_[True, sorted_facts[1:] != sorted_facts[:-1]])
+        group_start = np.repeat(starts, np.diff(np.r_[starts, len(facts)]))
+        rank = np.empty(len(facts))
+        rank[order] = np.arange(len(facts)) - group_start
+        x = self.attempts[facts] + rank
+
+        self.attempts += np.bincount(facts, minlength=cells)
+        self.correct += np.bincount(facts, weights=correct, minlength=cells)
+        self.latency_sum += np.bincount(facts, weights=latency_ms, minlength=cells)
+        self.sum_x += np.bincount(facts, weights=x, minlength=cells)
+        self.sum_xx += np.bincount(facts, weights=x * x, minlength=cells)
+        self.sum_xy += np.bincount(facts, weights=x * correct, minlength=cells)
+
+        bins = np.searchsorted(LATENCY_EDGES, latency_ms)
+        self.histogram += np.bincount(facts * len(BIN_LOW) + bins,
+                                      minlength=cells * len(BIN_LOW)).reshape(cells, len(BIN_LOW))
+
+    def update_from_log(self, answers):
+        """Fold in a session's AnswerLog without copying its arrays."""
+        self.update(np.frombuffer(answers.a, dtype=np.uint16),
+                    np.frombuffer(answers.b, dtype=np.uint16),
+                    np.frombuffer(answers.correct, dtype=np.uint8),
+                    np.frombuffer(answers.latency_ms, dtype=np.uint32))
+
+    # ---------------- Metrics ----------------
+    def grid(self, values):
+        return values.reshape(self.size, self.size)
+
+    def accuracy(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.grid(np.where(self.attempts > 0, self.correct / self.attempts, np.nan))
+
+    def mean_latency(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.grid(np.where(self.attempts > 0, self.latency_sum / self.attempts, np.nan))
+
+    def latency_percentile(self, q=90):
+        """Latency percentile per fact, interpolated inside the histogram bins."""
+        cumulative = np.cumsum(self.histogram, axis=1)
+        threshold = self.attempts * (q / 100)
+        index = np.argmax(cumulative >= threshold[:, None], axis=1)
+
+        rows = np.arange(len(index))
+        in_bin = self.histogram[rows, index]
+        before = cumulative[rows, index] - in_bin
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.clip((threshold - before) / in_bin, 0, 1)
+        value = BIN_LOW[index] + fraction * (BIN_HIGH[index] - BIN_LOW[index])
+        return self.grid(np.where(self.attempts > 0, value, np.nan))
+
+    def trend(self):
+        """Change in accuracy per 10 attempts (least-squares slope), NaN with too few attempts."""
+        n = self.attempts
+        denominator = n * self.sum_xx - self.sum_x ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slope = (n * self.sum_xy - self.sum_x * self.correct) / denominator
+        return self.grid(np.where((n >= MIN_TREND_ATTEMPTS) & (denominator > 0), slope * 10, np.nan))
+
+    # ---------------- Snapshots ----------------
+    def save(self, path):
+        np.savez(path, size=self.size, last_rowid=self.last_rowid, histogram=self.histogram,
+                 **{name: getattr(self, name) for name in self.SUMS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            stats = cls(0)
+            stats.size = int(data["size"])
+            stats.last_rowid = int(data["last_rowid"])
+            stats.histogram = data["histogram"]
+            for name in cls.SUMS:
+                setattr(stats, name, data[name])
+        return stats
+
+
+def load_mastery(history, player=""):
+    """MasteryStats for `player`, from the saved snapshot plus any newer answers."""
+    snapshot = None
+    stats = None
+    if history.path != ":memory:":
+        snapshot = f"{history.path}.mastery-{player or 'default'}.npz"
+        if os.path.exists(snapshot):
+            try:
+                stats = MasteryStats.load(snapshot)
+            except (OSError, ValueError, KeyError):
+                stats = None
+    if stats is None:
+        stats = MasteryStats()
+
+    rows = history.answer_rows(player, stats.last_rowid)
+    if len(rows):
+        data = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 5).reshape(-1, 5)
+        stats.update(data[:, 1], data[:, 2], data[:, 3], data[:, 4])
+        stats.last_rowid = int(data[-1, 0])
+        if snapshot:
+            stats.save(snapshot)
+    return stats
@@ -1,30 +1,56 @@
+import argparse
 import random
 import sys
 import time
+import weakref
+from collections import OrderedDict
+
+STARTED = time.perf_counter()  # before the Qt imports, for --startup-report
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QLabel, 
-                              QPushButton, QVBoxLayout, QGridLayout, QFrame, QScrollArea)
-from PyQt6.QtCore import Qt, QTimer, QRect, QPointF
-from PyQt6.QtGui import QPainter, QLinearGradient, QColor, QFont, QPainterPath, QRegion
+                              QPushButton, QVBoxLayout, QHBoxLayout, QGridLayout, QButtonGroup, QFrame,
+                              QComboBox, QLineEdit, QSpinBox,
+                              QSizePolicy, QStackedWidget, QTableView, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QAbstractTableModel, QModelIndex, QEvent, QElapsedTimer, QTimer, QMargins, QRect, QRectF, QPointF
+from PyQt6.QtGui import (QPainter, QLinearGradient, QColor, QFontMetrics, QKeySequence, QPainterPath, QPalette, QPixmap,
+                         QRegion, QShortcut)
 
+from history import FactStats, HistoryStore
+from profiles import (DEFAULT_PROFILE, MAX_NAME, PROFILE_DIR, last_profile, list_profiles, open_profile,
+                      profile_name, set_last_profile)
+import profiling
+from deck import MAX_TABLE_SIZE, parse_tables, table_facts
+from quiz_engine import (EVENT_ANSWER, EVENT_QUESTION, FEEDBACK_DELAY_MS, INPUT_CHOICES, INPUT_TYPED, TABLE_SIZE,
+                         EventLog, Question, QuizEngine, SessionSettings, format_time)
+from replay import LOG_DIR, save_log
+from scheduler import MODE_ADAPTIVE, MODE_UNIFORM, SpacedRepetitionScheduler
+from theme import (BUTTON_DANGER, BUTTON_LIGHT, BUTTON_PRIMARY, BUTTON_SECONDARY, BUTTON_TOGGLE, ROLE_ERROR,
+                   ROLE_SOFT, ROLE_TEXT, THEMES, apply_theme, current_theme, font, set_theme)
 
-class HeartButton(QPushButton):
-    def __init__(self, text="", parent=None):
-        super().__init__(text, parent)
-        self.setMinimumSize(200, 180)
-        self.is_hovered = False
-        
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        # Create heart shape mask
+
+# ---------------- Heart Geometry Cache ----------------
+HEART_CACHE_SIZE = 8
+BUTTON_RADIUS = 5
+BUTTON_PADDING = QMargins(10, 5, 10, 5)
+
+
+class HeartGeometry:
+    """Heart path, mask and pre-rendered pixmaps for one button size and theme."""
+
+    def __init__(self, width, height, dpr, theme):
+        self.path = self.build_path(width, height)
+        self.mask = QRegion(self.path.toFillPolygon().toPolygon())
+        self.pixmap = self.render(width, height, dpr, theme.heart[0])
+        self.hover_pixmap = self.render(width, height, dpr, theme.heart[1])
+
+    @staticmethod
+    def build_path(width, height):
         path = QPainterPath()
-        width = self.width()
-        height = self.height()
-        
+
         # Heart shape using Bezier curves
         # Start at bottom point
         path.moveTo(width / 2, height * 0.9)
-        
+
         # Left side of heart
         path.cubicTo(
             width * 0.1, height * 0.6,  # control point 1
@@ -36,7 +62,7 @@ class HeartButton(QPushButton):
             width * 0.5, height * 0.15, # control point 2
             width * 0.5, height * 0.3   # end point (center dip)
         )
-        
+
         # Right side of heart
         path.cubicTo(
             width * 0.5, height * 0.15, # control point 1
@@ -48,9 +74,61 @@ class HeartButton(QPushButton):
             width * 0.9, height * 0.6,  # control point 2
             width / 2, height * 0.9     # end point (bottom point)
         )
-        
+
         path.closeSubpath()
-        self.setMask(QRegion(path.toFillPolygon().toPolygon()))
+        return path
+
+    def render(self, width, height, dpr, color):
+        pixmap = QPixmap(max(1, round(width * dpr)), max(1, round(height * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawPath(self.path)
+        painter.end()
+        return pixmap
+
+
+_heart_cache = OrderedDict()
+
+
+def heart_geometry(width, height, dpr, theme):
+    """Shared HeartGeometry for a size and theme; least recently used entries are evicted."""
+    key = (width, height, dpr, theme.name)
+    geometry = _heart_cache.get(key)
+    if geometry is None:
+        geometry = HeartGeometry(width, height, dpr, theme)
+        _heart_cache[key] = geometry
+        if len(_heart_cache) > HEART_CACHE_SIZE:
+            _heart_cache.popitem(last=False)
+    else:
+        _heart_cache.move_to_end(key)
+    return geometry
+
+
+class HeartButton(QPushButton):
+    def __init__(self, text="", parent=None):
+        super().__init__(text, parent)
+        self.setMinimumSize(200, 180)
+        self.is_hovered = False
+        self.geometry_key = None
+        self.geometry_cache = None
+
+    def heart(self):
+        theme = current_theme()
+        key = (self.width(), self.height(), self.devicePixelRatioF(), theme)
+        if key != self.geometry_key:
+            self.geometry_key = key
+            self.geometry_cache = heart_geometry(*key)
+        return self.geometry_cache
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # Heart shape mask comes from the shared cache
+        self.setMask(self.heart().mask)
     
     def enterEvent(self, event):
         self.is_hovered = True
@@ -64,65 +142,281 @@ class HeartButton(QPushButton):
     
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        # Draw heart shape
-        path = QPainterPath()
-        width = self.width()
-        height = self.height()
-        
-        # Heart shape
-        path.moveTo(width / 2, height * 0.9)
-        path.cubicTo(
-            width * 0.1, height * 0.6,
-            width * 0.1, height * 0.2,
-            width * 0.3, height * 0.15
-        )
-        path.cubicTo(
-            width * 0.4, height * 0.1,
-            width * 0.5, height * 0.15,
-            width * 0.5, height * 0.3
-        )
-        path.cubicTo(
-            width * 0.5, height * 0.15,
-            width * 0.6, height * 0.1,
-            width * 0.7, height * 0.15
-        )
-        path.cubicTo(
-            width * 0.9, height * 0.2,
-            width * 0.9, height * 0.6,
-            width / 2, height * 0.9
-        )
-        path.closeSubpath()
-        
-        # Fill color based on hover state
-        if self.is_hovered:
-            painter.setBrush(QColor("#FFC1CC"))
-        else:
-            painter.setBrush(QColor("#ED1F64"))
-        
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawPath(path)
+        heart = self.heart()
+
+        # Pre-rendered heart based on hover state
+        painter.drawPixmap(0, 0, heart.hover_pixmap if self.is_hovered else heart.pixmap)
         
         # Draw text
-        if self.is_hovered:
-            painter.setPen(QColor("#000000"))
+        painter.setPen(current_theme().heart_text[1 if self.is_hovered else 0])
+        painter.setFont(self.font())
+        painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self.text())
+
+
+class ThemedButton(QPushButton):
+    """Flat rounded button painted straight from the current theme, no stylesheet."""
+
+    def __init__(self, text="", variant=BUTTON_PRIMARY, parent=None):
+        super().__init__(text, parent)
+        self.variant = variant
+        self.setAttribute(Qt.WidgetAttribute.WA_Hover)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+
+    def sizeHint(self):
+        metrics = QFontMetrics(self.font())
+        return metrics.size(Qt.TextFlag.TextShowMnemonic, self.text()).grownBy(BUTTON_PADDING)
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def paintEvent(self, event):
+        colors = current_theme().button(self.variant)
+        if self.isChecked():
+            background, text = colors.checked_background, colors.checked_text
+        elif self.underMouse() or self.isDown():
+            background, text = colors.hover_background, colors.hover_text
         else:
-            painter.setPen(QColor("#FFFFFF"))
+            background, text = colors.background, colors.text
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(QRectF(self.rect()), BUTTON_RADIUS, BUTTON_RADIUS)
+        painter.setPen(text)
         painter.setFont(self.font())
         painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self.text())
 
 
-class StartMenu(QMainWindow):
+# ---------------- Animation Scheduler ----------------
+FRAME_INTERVAL_MS = 16
+
+
+class AnimationScheduler(QObject):
+    """Advances every active effect from a single frame timer.
+
+    Effects implement advance(dt) and return False once finished. The timer
+    only runs while at least one effect is active.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.effects = []
+        self.watched = weakref.WeakSet()  # effects whose destroyed signal is connected
+        self.clock = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(FRAME_INTERVAL_MS)
+        self.timer.timeout.connect(self.tick)
+
+    def add(self, effect):
+        if effect not in self.effects:
+            self.effects.append(effect)
+        if effect not in self.watched:
+            # A widget deleted mid-animation (say its screen was replaced) must not be ticked again
+            self.watched.add(effect)
+            effect.destroyed.connect(lambda: self.remove(effect))
+        if not self.timer.isActive():
+            self.clock.start()
+            self.timer.start()
+
+    def remove(self, effect):
+        if effect in self.effects:
+            self.effects.remove(effect)
+
+    def tick(self):
+        dt = self.clock.restart() / 1000
+        self.effects = [effect for effect in self.effects if effect.advance(dt)]
+        if not self.effects:
+            self.timer.stop()
+
+
+_scheduler = None
+
+
+def animation_scheduler():
+    """The application-wide animation clock."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AnimationScheduler(QApplication.instance())
+    return _scheduler
+
+
+# ---------------- Star Sprites ----------------
+STAR_POOL_SIZE = 24
+STAR_LIFETIME = 0.88  # seconds, same as the old 11 steps of 80 ms
+STAR_SPEED = 100  # pixels per second upwards
+
+
+class StarSprite:
+    __slots__ = ("x", "y", "age", "active")
+
     def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Test: Tabla Inmultirii")
-        self.setGeometry(100, 100, 600, 500)
-        self.setMinimumSize(500, 400)
-        
-        # Central widget with gradient background
-        self.central_widget = GradientWidget()
-        self.setCentralWidget(self.central_widget)
+        self.x = self.y = self.age = 0.0
+        self.active = False
+
+
+class StarOverlay(QWidget):
+    """Transparent layer over its parent that draws pooled star sprites in one pass."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
+        self.sprites = [StarSprite() for _ in range(STAR_POOL_SIZE)]
+        self.active_count = 0
+        self.star_pixmap = None
+        self.resize(parent.size())
+        parent.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.parent() and event.type() == QEvent.Type.Resize:
+            self.resize(obj.size())
+        return False
+
+    def render_star(self):
+        star_font = font(30)
+        metrics = QFontMetrics(star_font)
+        rect = metrics.boundingRect("⭐")
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(max(1, round(rect.width() * dpr)), max(1, round(rect.height() * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setFont(star_font)
+        painter.drawText(QRect(0, 0, rect.width(), rect.height()), Qt.AlignmentFlag.AlignCenter, "⭐")
+        painter.end()
+        return pixmap
+
+    def sprite_rect(self, sprite):
+        size = self.star_pixmap.deviceIndependentSize()
+        return QRect(int(sprite.x), int(sprite.y), int(size.width()) + 1, int(size.height()) + 1)
+
+    def spawn(self, x, y):
+        if self.star_pixmap is None:
+            self.star_pixmap = self.render_star()
+
+        # Take a free slot, or recycle the oldest star when the pool is full
+        free = [sprite for sprite in self.sprites if not sprite.active]
+        sprite = free[0] if free else max(self.sprites, key=lambda star: star.age)
+        if sprite.active:
+            self.update(self.sprite_rect(sprite))
+        else:
+            self.active_count += 1
+        sprite.x, sprite.y, sprite.age, sprite.active = x, y, 0.0, True
+
+        self.raise_()
+        self.show()
+        self.update(self.sprite_rect(sprite))
+        animation_scheduler().add(self)
+
+    def clear(self):
+        for sprite in self.sprites:
+            sprite.active = False
+        self.active_count = 0
+        animation_scheduler().remove(self)
+        self.update()
+
+    def advance(self, dt):
+        for sprite in self.sprites:
+            if not sprite.active:
+                continue
+            self.update(self.sprite_rect(sprite))
+            sprite.age += dt
+            if sprite.age >= STAR_LIFETIME:
+                sprite.active = False
+                self.active_count -= 1
+                continue
+            sprite.y -= STAR_SPEED * dt
+            self.update(self.sprite_rect(sprite))
+        return self.active_count > 0
+
+    def paintEvent(self, event):
+        if not self.active_count:
+            return
+        painter = QPainter(self)
+        for sprite in self.sprites:
+            if sprite.active:
+                painter.drawPixmap(QPointF(sprite.x, sprite.y), self.star_pixmap)
+
+
+# ---------------- Mistake List ----------------
+def transparent_table(view):
+    """Let the screen gradient show through a table; text colors still follow the theme."""
+    palette = view.palette()
+    for role in (QPalette.ColorRole.Base, QPalette.ColorRole.AlternateBase, QPalette.ColorRole.Button):
+        palette.setColor(role, Qt.GlobalColor.transparent)
+    view.setPalette(palette)
+    view.horizontalHeader().setPalette(palette)
+    view.setFrameShape(QFrame.Shape.NoFrame)
+    view.viewport().setAutoFillBackground(False)
+
+
+class MistakeModel(QAbstractTableModel):
+    """Table model over the per-fact Mistake groups of a finished session."""
+
+    FACT, ANSWERS, COUNT, TIME = range(4)
+    HEADERS = ["Intrebare", "Ai raspuns", "Greseli", "Timp mediu"]
+    SORT_KEYS = {
+        FACT: lambda mistake: (mistake.a, mistake.b),
+        ANSWERS: lambda mistake: mistake.user_answers,
+        COUNT: lambda mistake: mistake.count,
+        TIME: lambda mistake: mistake.mean_time,
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.mistakes = []
+
+    def set_mistakes(self, mistakes):
+        self.beginResetModel()
+        self.mistakes = list(mistakes)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.mistakes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        mistake = self.mistakes[index.row()]
+        column = index.column()
+        if column == self.FACT:
+            return f"{mistake.question} = {mistake.correct}"
+        if column == self.ANSWERS:
+            return ", ".join(str(answer) for answer in mistake.user_answers)
+        if column == self.COUNT:
+            return f"{mistake.count}×"
+        return f"{mistake.mean_time:.1f}s"
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.mistakes.sort(key=self.SORT_KEYS[column], reverse=order == Qt.SortOrder.DescendingOrder)
+        self.layoutChanged.emit()
+
+
+class StartMenu(QWidget):
+    quiz_requested = pyqtSignal(object)
+    mastery_requested = pyqtSignal()
+    profile_selected = pyqtSignal(str)
+
+    window_title = "Test: Tabla Inmultirii"
+    window_minimum_size = (500, 400)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
         
         # Main layout
         layout = QVBoxLayout()
@@ -131,135 +425,337 @@ class StartMenu(QMainWindow):
         
         # Title
         title = QLabel("Test de Tabla Inmultirii")
-        title.setFont(QFont("Helvetica", 42, QFont.Weight.Bold))
-        title.setStyleSheet("color: #5A375A; background: transparent;")
+        title.setFont(font(42, bold=True))
+        title.setForegroundRole(ROLE_TEXT)
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
         layout.addSpacing(20)
+
+        # Who is playing; shown only when the window keeps profiles
+        self.profile_row = QWidget()
+        profile_layout = QHBoxLayout()
+        profile_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        profile_layout.setContentsMargins(0, 0, 0, 0)
+        profile_label = QLabel("Elev:")
+        profile_label.setFont(font(20))
+        profile_label.setForegroundRole(ROLE_TEXT)
+        profile_layout.addWidget(profile_label)
+        self.profile_input = QComboBox()
+        self.profile_input.setEditable(True)
+        self.profile_input.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.profile_input.lineEdit().setPlaceholderText("Scrie numele tau")
+        self.profile_input.lineEdit().setMaxLength(MAX_NAME)
+        self.profile_input.setFont(font(20))
+        self.profile_input.setMinimumWidth(240)
+        self.profile_input.setFrame(False)
+        self.profile_input.textActivated.connect(self.choose_profile)
+        profile_layout.addWidget(self.profile_input)
+        self.profile_row.setLayout(profile_layout)
+        self.profile_row.hide()
+        layout.addWidget(self.profile_row)
+        layout.addSpacing(10)
         
         # Subtitle
         subtitle = QLabel("Alege numarul de intrebari:")
-        subtitle.setFont(QFont("Helvetica", 24))
-        subtitle.setStyleSheet("color: #5A375A; background: transparent;")
+        subtitle.setFont(font(24))
+        subtitle.setForegroundRole(ROLE_TEXT)
         subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(subtitle)
-        layout.addSpacing(30)
+        layout.addSpacing(20)
+
+        # Question order: uniform random or adaptive spaced repetition
+        self.mode = MODE_UNIFORM
+        mode_row = QHBoxLayout()
+        mode_row.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.mode_buttons = QButtonGroup(self)
+        for mode, text in ((MODE_UNIFORM, "Aleator"), (MODE_ADAPTIVE, "Adaptiv")):
+            btn = ThemedButton(text, BUTTON_TOGGLE)
+            btn.setCheckable(True)
+            btn.setChecked(mode == self.mode)
+            btn.setFont(font(16))
+            btn.setMinimumSize(120, 40)
+            btn.clicked.connect(lambda checked, m=mode: self.set_mode(m))
+            self.mode_buttons.addButton(btn)
+            mode_row.addWidget(btn)
+        layout.addLayout(mode_row)
+        layout.addSpacing(10)
+
+        # Which tables, and how far each one goes
+        tables_row = QHBoxLayout()
+        tables_row.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        tables_label = QLabel("Tablele:")
+        tables_label.setFont(font(16))
+        tables_label.setForegroundRole(ROLE_TEXT)
+        tables_row.addWidget(tables_label)
+        self.tables_input = QLineEdit("1-10")
+        self.tables_input.setFont(font(16))
+        self.tables_input.setFixedWidth(140)
+        self.tables_input.setToolTip("De exemplu: 1-10, sau 7, 8")
+        self.tables_input.setFrame(False)
+        tables_row.addWidget(self.tables_input)
+        operand_label = QLabel("ori 1 pana la")
+        operand_label.setFont(font(16))
+        operand_label.setForegroundRole(ROLE_TEXT)
+        tables_row.addWidget(operand_label)
+        self.max_operand_input = QSpinBox()
+        self.max_operand_input.setRange(1, MAX_TABLE_SIZE)
+        self.max_operand_input.setValue(TABLE_SIZE)
+        self.max_operand_input.setFont(font(16))
+        self.max_operand_input.setFrame(False)
+        tables_row.addWidget(self.max_operand_input)
+        layout.addLayout(tables_row)
+
+        # How answers are given, and how long the feedback stays before the next question
+        self.answer_input = INPUT_CHOICES
+        input_row = QHBoxLayout()
+        input_row.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.input_buttons = QButtonGroup(self)
+        for answer_input, text, tip in ((INPUT_CHOICES, "Taste 1-4", "Alegi inima cu tastele 1-4 sau cu mouse-ul"),
+                                        (INPUT_TYPED, "Scrie", "Scrii raspunsul si apesi Enter")):
+            btn = ThemedButton(text, BUTTON_TOGGLE)
+            btn.setCheckable(True)
+            btn.setChecked(answer_input == self.answer_input)
+            btn.setToolTip(tip)
+            btn.setFont(font(16))
+            btn.setMinimumSize(110, 36)
+            btn.clicked.connect(lambda checked, i=answer_input: self.set_answer_input(i))
+            self.input_buttons.addButton(btn)
+            input_row.addWidget(btn)
+        delay_label = QLabel("Pauza:")
+        delay_label.setFont(font(16))
+        delay_label.setForegroundRole(ROLE_TEXT)
+        input_row.addSpacing(10)
+        input_row.addWidget(delay_label)
+        self.delay_input = QSpinBox()
+        self.delay_input.setRange(0, 3000)
+        self.delay_input.setSingleStep(250)
+        self.delay_input.setValue(FEEDBACK_DELAY_MS)
+        self.delay_input.setSuffix(" ms")
+        self.delay_input.setSpecialValueText("fara")
+        self.delay_input.setToolTip("Cat ramane mesajul dupa raspuns; fara pauza e modul de viteza")
+        self.delay_input.setFont(font(16))
+        self.delay_input.setFrame(False)
+        input_row.addWidget(self.delay_input)
+        layout.addLayout(input_row)
+
+        self.error_label = QLabel()
+        self.error_label.setFont(font(14))
+        self.error_label.setForegroundRole(ROLE_ERROR)
+        self.error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.error_label)
+        layout.addSpacing(10)
         
         # Buttons for different question counts
         question_options = [10, 25, 50, 100]
         for num in question_options:
-            btn = QPushButton(f"{num} intrebari")
-            btn.setFont(QFont("Helvetica", 20))
+            btn = ThemedButton(f"{num} intrebari", BUTTON_PRIMARY)
+            btn.setFont(font(20))
             btn.setMinimumSize(250, 60)
-            btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #ED1F64;
-                    color: #FFFFFF;
-                    border: none;
-                    border-radius: 5px;
-                }
-                QPushButton:hover {
-                    background-color: #FFC1CC;
-                    color: #000000;
-                }
-            """)
             btn.clicked.connect(lambda checked, n=num: self.start_quiz(n))
             layout.addWidget(btn, alignment=Qt.AlignmentFlag.AlignCenter)
             layout.addSpacing(10)
+
+        # Any other length; 0 is an endless drill
+        custom_row = QHBoxLayout()
+        custom_row.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.length_input = QSpinBox()
+        self.length_input.setRange(0, 100000)
+        self.length_input.setValue(20)
+        self.length_input.setSpecialValueText("fara sfarsit")
+        self.length_input.setFont(font(16))
+        self.length_input.setMinimumWidth(140)
+        self.length_input.setFrame(False)
+        custom_row.addWidget(self.length_input)
+        custom_button = ThemedButton("Start", BUTTON_PRIMARY)
+        custom_button.setFont(font(16))
+        custom_button.setMinimumSize(100, 36)
+        custom_button.clicked.connect(lambda: self.start_quiz(self.length_input.value() or None))
+        custom_row.addWidget(custom_button)
+        layout.addLayout(custom_row)
+        layout.addSpacing(10)
+
+        # Mastery overview and theme switch
+        bottom_row = QHBoxLayout()
+        bottom_row.addStretch()
+        mastery_button = ThemedButton("Progres", BUTTON_SECONDARY)
+        mastery_button.setFont(font(20))
+        mastery_button.setMinimumSize(250, 60)
+        mastery_button.clicked.connect(self.mastery_requested.emit)
+        bottom_row.addWidget(mastery_button)
+        self.theme_button = ThemedButton("", BUTTON_LIGHT)
+        self.theme_button.setFont(font(16))
+        self.theme_button.setMinimumSize(150, 60)
+        self.theme_button.clicked.connect(self.next_theme)
+        bottom_row.addWidget(self.theme_button)
+        bottom_row.addStretch()
+        layout.addLayout(bottom_row)
+        self.show_theme()
         
-        self.central_widget.setLayout(layout)
+        self.setLayout(layout)
     
+    def set_mode(self, mode):
+        self.mode = mode
+
+    def set_answer_input(self, answer_input):
+        self.answer_input = answer_input
+
+    def next_theme(self):
+        names = list(THEMES)
+        set_theme(names[(names.index(current_theme().name) + 1) % len(names)])
+        self.show_theme()
+
+    def show_theme(self):
+        self.theme_button.setText(f"Tema: {current_theme().label}")
+
+    def show_profiles(self, names, current):
+        self.profile_input.blockSignals(True)
+        self.profile_input.clear()
+        self.profile_input.addItems(names)
+        self.profile_input.setCurrentText(current)
+        self.profile_input.blockSignals(False)
+        self.profile_row.show()
+
+    def choose_profile(self, text):
+        """Switch to the profile typed or picked; a new name starts a new profile."""
+        try:
+            name = profile_name(text)
+        except ValueError:
+            self.error_label.setText(f"Numele are cel mult {MAX_NAME} litere, cifre, spatii, - sau _")
+            return False
+        self.error_label.setText("")
+        self.profile_selected.emit(name)
+        return True
+
     def start_quiz(self, num_questions):
-        self.quiz_window = MultiplicationQuiz(num_questions)
-        self.quiz_window.show()
-        self.close()
+        if self.profile_row.isVisible() and not self.choose_profile(self.profile_input.currentText()):
+            return
+        try:
+            tables = parse_tables(self.tables_input.text())
+        except ValueError:
+            self.error_label.setText(f"Scrie tablele ca 1-10 sau 7, 8 (intre 1 si {MAX_TABLE_SIZE})")
+            return
+        self.error_label.setText("")
+        self.quiz_requested.emit(SessionSettings(num_questions, tuple(tables), self.max_operand_input.value(), self.mode,
+                                                 self.delay_input.value(), self.answer_input))
 
 
-class MultiplicationQuiz(QMainWindow):
-    def __init__(self, total_questions):
-        super().__init__()
-        self.total_questions = total_questions
-        super().__init__()
-        self.setWindowTitle("Test de Tabla Inmultirii")
-        self.setGeometry(100, 100, 900, 650)
-        self.setMinimumSize(1200, 950)
+# ---------------- Quiz States ----------------
+STATE_IDLE = "idle"  # stopped, nothing asked yet
+STATE_ASKING = "asking"  # a question is shown and takes exactly one answer
+STATE_FEEDBACK = "feedback"  # answered; input is ignored until the next question is shown
+STATE_FINISHED = "finished"  # end page
+
+QUIZ_TRANSITIONS = {
+    STATE_IDLE: {STATE_ASKING, STATE_FINISHED},
+    STATE_ASKING: {STATE_FEEDBACK, STATE_FINISHED, STATE_IDLE},
+    STATE_FEEDBACK: {STATE_ASKING, STATE_FINISHED, STATE_IDLE},
+    STATE_FINISHED: {STATE_IDLE},
+}
+MAX_TYPED_DIGITS = 4
+
+
+class MultiplicationQuiz(QWidget):
+    menu_requested = pyqtSignal()
+    session_finished = pyqtSignal(object)
 
-        self.score = 0
-        self.current_question = 0
-        self.wrong_answers = []  # Track wrong answers
+    window_title = "Test de Tabla Inmultirii"
+    window_minimum_size = (1200, 950)
+
+    def __init__(self, total_questions=10, history=None, log_dir=None, parent=None):
+        super().__init__(parent)
+
+        # All quiz state and rules live in the engine; this screen only renders it
+        self.engine = QuizEngine(total_questions)
+        self.settings = None
+        self.session_seed = None  # None draws a fresh seed for every session
+
+        # Event logs of finished (or abandoned) sessions go here, for replay
+        self.log_dir = log_dir
+        self.log_saved = True
+        self.star_rng = random.Random()
+
+        # Optional persistent history, plus the lifetime per-fact stats loaded from it
+        self.history = history
+        self.player = ""
+        self.archive = None  # the player's AnswerArchive, when profiles are kept
+        self.session_id = None
+        self.fact_stats = history.fact_stats(self.player) if history else {}
+        self.adaptive_scheduler = None
+
+        # Input only counts while asking; see QUIZ_TRANSITIONS
+        self.state = STATE_IDLE
+        self.feedback_delay = FEEDBACK_DELAY_MS
+        self.answer_input = INPUT_CHOICES
+        self.typed = ""
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         
-        # Timer variables
-        self.start_time = None
-        self.elapsed_time = 0
-        self.timer = QTimer()
+        # Timers
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self.update_timer)
-        
-        # Central widget with gradient background
-        self.central_widget = GradientWidget()
-        self.setCentralWidget(self.central_widget)
+        self.shown_second = 0
+        self.next_question_timer = QTimer(self)
+        self.next_question_timer.setSingleShot(True)
+        self.next_question_timer.timeout.connect(self.new_question)
         
         # Main layout
         main_layout = QVBoxLayout()
         main_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
         
-        # Main frame for question widgets
-        self.main_frame = QWidget()
-        self.main_frame.setStyleSheet("background: transparent;")
+        # Main frame holding the persistent question and end pages
+        self.main_frame = QStackedWidget()
+        self.star_overlay = StarOverlay(self.main_frame)
         main_layout.addWidget(self.main_frame, alignment=Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
         
         # Timer label at top
         self.timer_label = QLabel("Timp: 00:00")
-        self.timer_label.setStyleSheet("color: #5A375A; background: transparent;")
-        self.timer_label.setFont(QFont("Helvetica", 24, QFont.Weight.Bold))
+        self.timer_label.setForegroundRole(ROLE_TEXT)
+        self.timer_label.setFont(font(24, bold=True))
         self.timer_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(self.timer_label)
         
         # Score label at bottom
-        self.score_label = QLabel(f"Scor: {self.score}")
-        self.score_label.setStyleSheet("color: #FFC1CC; background: transparent;")
-        self.score_label.setFont(QFont("Helvetica", 46))
+        self.score_label = QLabel(f"Scor: {self.engine.score}")
+        self.score_label.setForegroundRole(ROLE_SOFT)
+        self.score_label.setFont(font(46))
         self.score_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addStretch()
         main_layout.addWidget(self.score_label)
         main_layout.setContentsMargins(20, 20, 20, 20)
         
-        self.central_widget.setLayout(main_layout)
+        self.setLayout(main_layout)
 
-        # Build question widgets
+        # Build both pages once; later transitions only update their data
         self.build_question_widgets()
-
-        # Start first question
-        self.new_question()
+        self.build_end_widgets()
 
     # ---------------- Build Question Widgets ----------------
     def build_question_widgets(self):
-        # Clear existing layout
-        if self.main_frame.layout():
-            QWidget().setLayout(self.main_frame.layout())
-        
+        self.question_page = QWidget()
         layout = QVBoxLayout()
         layout.setAlignment(Qt.AlignmentFlag.AlignTop)
         layout.setContentsMargins(20, 20, 20, 20)
         
         # Question label
         self.question_label = QLabel()
-        self.question_label.setFont(QFont("Helvetica", 46, QFont.Weight.Bold))
-        self.question_label.setStyleSheet("color: #FFC1CC; background: transparent;")
+        self.question_label.setFont(font(46, bold=True))
+        self.question_label.setForegroundRole(ROLE_SOFT)
         self.question_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.question_label)
         layout.addSpacing(20)
         
         # Buttons grid
         buttons_widget = QWidget()
-        buttons_widget.setStyleSheet("background: transparent;")
         buttons_layout = QGridLayout()
         buttons_layout.setSpacing(10)
         
         self.buttons = []
         for i in range(4):
             btn = HeartButton()
-            btn.setFont(QFont("Helvetica", 28, QFont.Weight.Bold))
+            btn.setFont(font(28, bold=True))
             btn.setMinimumSize(220, 200)
+            btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
             btn.clicked.connect(lambda checked, x=i: self.check_answer(x))
             buttons_layout.addWidget(btn, i // 2, i % 2)
             self.buttons.append(btn)
@@ -267,302 +763,1207 @@ class MultiplicationQuiz(QMainWindow):
         buttons_widget.setLayout(buttons_layout)
         layout.addWidget(buttons_widget, alignment=Qt.AlignmentFlag.AlignCenter)
         layout.addSpacing(15)
+
+        # Typed answer, shown only when answering by keyboard numbers
+        self.typed_label = QLabel()
+        self.typed_label.setFont(font(32, bold=True))
+        self.typed_label.setForegroundRole(ROLE_TEXT)
+        self.typed_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.typed_label.hide()
+        layout.addWidget(self.typed_label)
         
         # Feedback label
         self.feedback_label = QLabel()
-        self.feedback_label.setFont(QFont("Helvetica", 46, QFont.Weight.Bold))
-        self.feedback_label.setStyleSheet("background: transparent;")
+        self.feedback_label.setFont(font(46, bold=True))
         self.feedback_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.feedback_label)
+
+        # Ends an endless drill; hidden for fixed-length sessions
+        self.done_button = ThemedButton("Gata", BUTTON_SECONDARY)
+        self.done_button.setFont(font(20))
+        self.done_button.setMinimumSize(200, 50)
+        self.done_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.done_button.clicked.connect(self.finish_drill)
+        self.done_button.hide()
+        layout.addWidget(self.done_button, alignment=Qt.AlignmentFlag.AlignCenter)
         
-        self.main_frame.setLayout(layout)
-        
-        # Update score
-        self.score_label.setText(f"Scor: {self.score}")
+        self.question_page.setLayout(layout)
+        self.main_frame.addWidget(self.question_page)
 
     # ---------------- Game Logic ----------------
-    def new_question(self):
-        if self.current_question >= self.total_questions:
-            self.timer.stop()  # Stop timer when quiz ends
-            self.show_end_screen()
+    def start(self, settings):
+        self.settings = settings
+        self.prepare_engine(settings)
+        self.engine.reset(settings.total_questions)
+        self.feedback_delay = settings.feedback_delay
+        self.answer_input = settings.answer_input
+        self.typed_label.setVisible(self.answer_input == INPUT_TYPED)
+        self.done_button.setVisible(settings.total_questions is None)
+        self.restart()
+        self.setFocus()
+
+    def prepare_engine(self, settings):
+        """Point the engine at the chosen tables and question order."""
+        self.engine.set_scheduler(None)
+        facts = table_facts(settings.tables, settings.max_operand)
+        if facts != self.engine.facts:
+            self.engine.set_facts(facts)
+            self.adaptive_scheduler = None
+
+        if settings.mode == MODE_ADAPTIVE:
+            # Built once per table selection from the lifetime stats, then kept across sessions
+            if self.adaptive_scheduler is None:
+                self.adaptive_scheduler = SpacedRepetitionScheduler(self.engine.facts, self.fact_stats,
+                                                                    self.engine.draw_seed())
+            self.engine.set_scheduler(self.adaptive_scheduler)
+
+    def set_profile(self, name, archive):
+        """Play as `name` from the next session on, with lifetime stats read from `archive`."""
+        self.player = name
+        self.archive = archive
+        self.fact_stats = archive.fact_stats()
+        self.adaptive_scheduler = None
+
+    def set_state(self, state):
+        if state != self.state and state not in QUIZ_TRANSITIONS[self.state]:
+            raise RuntimeError(f"quiz cannot go from {self.state} to {state}")
+        self.state = state
+
+    def finish_drill(self):
+        if self.state not in (STATE_ASKING, STATE_FEEDBACK):
             return
+        self.next_question_timer.stop()
+        self.engine.stop()
+        self.new_question()
 
-        # Start timer on first question
-        if self.current_question == 0:
-            self.start_time = time.time()
-            self.timer.start(100)  # Update timer every 100ms
-        
-        self.current_question += 1
-        self.feedback_label.setText("")
+    def new_question(self):
+        question = self.engine.new_question()
+        if question is None:
+            self.finish_session()
+        else:
+            self.show_question(question)
 
-        self.a = random.randint(1, 10)
-        self.b = random.randint(1, 10)
-        self.correct_answer = self.a * self.b
+    def finish_session(self):
+        self.set_state(STATE_FINISHED)
+        self.timer.stop()  # Stop timer when quiz ends
+        self.engine.update_elapsed()
+        if self.history:
+            self.history.finish_session(self.session_id, self.engine.score, self.engine.elapsed_time)
+            self.session_id = None
+        if self.archive is not None:
+            self.archive.flush()
+        self.save_log()
+        self.show_end_screen()
+        self.session_finished.emit(self.engine.summary())
 
+    def show_question(self, question):
+        # Start timer on first question
+        if question.number == 1:
+            self.update_timer()
+
+        # Without a pause the last feedback stays up over the next question
+        if self.feedback_delay:
+            self.feedback_label.setText("")
+        self.set_typed("")
+        progress = f"{question.number}/{self.engine.total_questions}" if self.engine.total_questions else question.number
         self.question_label.setText(
-            f"Intrebarea {self.current_question}/{self.total_questions}\n\n{self.a} × {self.b} = ?"
+            f"Intrebarea {progress}\n\n{question.a} × {question.b} = ?"
         )
 
-        answers = [self.correct_answer]
-        while len(answers) < 4:
-            wrong = random.randint(1, 100)
-            if wrong not in answers:
-                answers.append(wrong)
-        random.shuffle(answers)
-
-        for i, btn in enumerate(self.buttons):
-            btn.setText(str(answers[i]))
-            btn.answer = answers[i]
+        for btn, answer in zip(self.buttons, question.choices):
+            btn.setText(str(answer))
+            btn.answer = answer
+        self.set_state(STATE_ASKING)
 
     def check_answer(self, index):
-        correct_messages = ["Excelent 🦄", "Foarte Bine 🎉", "Ai dreptate 😘", "Te descurci excelent 👏", "Avem un mic geniu printre noi 🧠", "Corect 👏", "O sa ajungi departe 🚀"]
-        wrong_messages = ["Aproape bine 🙈", "Nu e bai, mai incearca 🤩", "Se poate intampla oricui 🐵", "Hai ca poti 👸", "Nici eu nu o stiam pe asta 🙊", "Repetitia e mama invataturii 🤩", "Haide, nu te lasa 💪"]
-        
-        if self.buttons[index].answer == self.correct_answer:
-            self.score += 1
-            self.feedback_label.setText(random.choice(correct_messages))
-            self.feedback_label.setStyleSheet("color: #FFC1CC; background: transparent;")
+        if self.state != STATE_ASKING:
+            return  # extra clicks during the feedback pause
+        self.show_feedback(self.engine.check_answer(index))
+
+    def submit_typed(self):
+        if self.state != STATE_ASKING or not self.typed:
+            return
+        self.show_feedback(self.engine.submit_answer(int(self.typed)))
+
+    def show_feedback(self, correct):
+        self.set_state(STATE_FEEDBACK)
+        self.record_answer(correct)
+        self.feedback_label.setText(self.engine.feedback_message(correct))
+        if correct:
+            self.feedback_label.setForegroundRole(ROLE_SOFT)
             self.spawn_stars()
         else:
-            # Track wrong answer
-            self.wrong_answers.append({
-                'question': f"{self.a} × {self.b}",
-                'correct': self.correct_answer,
-                'user_answer': self.buttons[index].answer
-            })
-            self.feedback_label.setText(random.choice(wrong_messages))
-            self.feedback_label.setStyleSheet("color: #C2185B; background: transparent;")
-
-        self.score_label.setText(f"Scor: {self.score}")
-        QTimer.singleShot(1000, self.new_question)
+            self.feedback_label.setForegroundRole(ROLE_ERROR)
+
+        self.score_label.setText(f"Scor: {self.engine.score}")
+
+        self.prefetch_question()
+        if self.feedback_delay:
+            self.next_question_timer.start(self.feedback_delay)
+        else:
+            self.new_question()
+
+    def prefetch_question(self):
+        # Build the next question now, so showing it later is only a label update
+        self.engine.prefetch()
+
+    # ---------------- Keyboard ----------------
+    def set_typed(self, text):
+        self.typed = text
+        if self.answer_input == INPUT_TYPED:
+            self.typed_label.setText(f"Raspuns: {text}_")
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        if self.state != STATE_ASKING:
+            super().keyPressEvent(event)
+        elif self.answer_input == INPUT_CHOICES and Qt.Key.Key_1 <= key < Qt.Key.Key_1 + len(self.buttons):
+            self.check_answer(key - Qt.Key.Key_1)
+        elif self.answer_input == INPUT_TYPED and Qt.Key.Key_0 <= key <= Qt.Key.Key_9:
+            if len(self.typed) < MAX_TYPED_DIGITS:
+                self.set_typed(self.typed + str(key - Qt.Key.Key_0))
+        elif self.answer_input == INPUT_TYPED and key == Qt.Key.Key_Backspace:
+            self.set_typed(self.typed[:-1])
+        elif key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            self.submit_typed()
+        else:
+            super().keyPressEvent(event)
+
+    def record_answer(self, correct):
+        answers = self.engine.answers
+        a, b, latency_ms = answers.a[-1], answers.b[-1], answers.latency_ms[-1]
+        stats = self.fact_stats.get((a, b))
+        if stats is None:
+            stats = self.fact_stats[(a, b)] = FactStats()
+        stats.add(correct, latency_ms)
+        if self.history:
+            self.history.record_answer(self.session_id, a, b, answers.user_answer[-1], correct, latency_ms)
+        if self.archive is not None:
+            self.archive.append(a, b, answers.user_answer[-1], correct, latency_ms)
 
     # ---------------- Timer Update ----------------
     def update_timer(self):
-        if self.start_time:
-            self.elapsed_time = time.time() - self.start_time
-            minutes = int(self.elapsed_time // 60)
-            seconds = int(self.elapsed_time % 60)
-            self.timer_label.setText(f"Timp: {minutes:02d}:{seconds:02d}")
+        if self.engine.start_time is None:
+            return
+        elapsed = self.engine.update_elapsed()
+
+        # Repaint only when the displayed second changes
+        second = int(elapsed)
+        if second != self.shown_second:
+            self.shown_second = second
+            self.timer_label.setText(f"Timp: {format_time(elapsed)}")
+
+        # Wake up again right after the next second boundary
+        self.timer.start(1000 - int(elapsed * 1000) % 1000 + 1)
     
     def format_time(self, seconds):
         """Format seconds into MM:SS string"""
-        mins = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{mins:02d}:{secs:02d}"
+        return format_time(seconds)
 
     # ---------------- End Screen ----------------
-    def show_end_screen(self):
-        # Clear existing layout
-        if self.main_frame.layout():
-            QWidget().setLayout(self.main_frame.layout())
-        
+    def build_end_widgets(self):
+        self.end_page = QWidget()
         layout = QVBoxLayout()
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.setContentsMargins(30, 30, 30, 30)
-        
-        self.buttons = []
-
-        percentage_score = (self.score / self.total_questions) * 100
 
-        if percentage_score == 100:
-            congrats_text = "Esti un geniu! Felicitari! 🌟🌟🌟"
-        elif percentage_score >= 75:
-            congrats_text = "Excelent! Ai invatat bine! 🎉"
-        elif percentage_score >= 50:
-            congrats_text = "Bine! Mai exerseaza putin! 👍"
-        elif percentage_score >= 25:
-            congrats_text = "Nu e rau! Mai incearca! 🤗"
-        else:
-            congrats_text = "Nu te descuraja! Mai incearca! 💪"
-
-        congrats_label = QLabel(congrats_text)
-        congrats_label.setFont(QFont("Helvetica", 42, QFont.Weight.Bold))
-        congrats_label.setStyleSheet("color: #5A375A; background: transparent;")
-        congrats_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(congrats_label)
+        self.congrats_label = QLabel()
+        self.congrats_label.setFont(font(42, bold=True))
+        self.congrats_label.setForegroundRole(ROLE_TEXT)
+        self.congrats_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.congrats_label)
         layout.addSpacing(20)
 
-        score_text_label = QLabel(f"Scorul tau este: {self.score} puncte din {self.total_questions} ({percentage_score:.2f}%)")
-        score_text_label.setFont(QFont("Helvetica", 38))
-        score_text_label.setStyleSheet("color: #FFC1CC; background: transparent;")
-        score_text_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(score_text_label)
+        self.score_text_label = QLabel()
+        self.score_text_label.setFont(font(38))
+        self.score_text_label.setForegroundRole(ROLE_SOFT)
+        self.score_text_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.score_text_label)
         layout.addSpacing(10)
         
-        # Show time taken
-        time_label = QLabel(f"Timp total: {self.format_time(self.elapsed_time)}")
-        time_label.setFont(QFont("Helvetica", 32))
-        time_label.setStyleSheet("color: #5A375A; background: transparent;")
-        time_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(time_label)
+        # Time taken
+        self.time_label = QLabel()
+        self.time_label.setFont(font(32))
+        self.time_label.setForegroundRole(ROLE_TEXT)
+        self.time_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.time_label)
         layout.addSpacing(20)
         
-        # Show wrong answers if any
-        if self.wrong_answers:
-            wrong_title = QLabel("Trebuie sa mai repeti:")
-            wrong_title.setFont(QFont("Helvetica", 32, QFont.Weight.Bold))
-            wrong_title.setStyleSheet("color: #C2185B; background: transparent;")
-            wrong_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.addWidget(wrong_title)
-            layout.addSpacing(10)
-            
-            # Create scrollable area for wrong answers
-            scroll_area = QScrollArea()
-            scroll_area.setWidgetResizable(True)
-            scroll_area.setMaximumHeight(200)
-            scroll_area.setStyleSheet("""
-                QScrollArea {
-                    background: transparent;
-                    border: 2px solid #C2185B;
-                    border-radius: 10px;
-                }
-                QScrollBar:vertical {
-                    background: #FFE6F0;
-                    width: 12px;
-                    border-radius: 6px;
-                }
-                QScrollBar::handle:vertical {
-                    background: #ED1F64;
-                    border-radius: 6px;
-                }
-            """)
-            
-            # Widget to hold wrong answers
-            wrong_widget = QWidget()
-            wrong_widget.setStyleSheet("background: transparent;")
-            wrong_layout = QVBoxLayout()
-            wrong_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-            wrong_layout.setContentsMargins(10, 10, 10, 10)
-            
-            # Add each wrong answer as a separate label
-            for wrong in self.wrong_answers:
-                answer_label = QLabel(f"{wrong['question']} = {wrong['correct']}   (ai raspuns: {wrong['user_answer']})")
-                answer_label.setFont(QFont("Helvetica", 30))
-                answer_label.setStyleSheet("color: #5A375A; background: transparent;")
-                answer_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                wrong_layout.addWidget(answer_label)
-            
-            wrong_widget.setLayout(wrong_layout)
-            scroll_area.setWidget(wrong_widget)
-            layout.addWidget(scroll_area)
-            layout.addSpacing(10)
+        # Wrong answers, hidden when there are none
+        self.wrong_title = QLabel("Trebuie sa mai repeti:")
+        self.wrong_title.setFont(font(32, bold=True))
+        self.wrong_title.setForegroundRole(ROLE_ERROR)
+        self.wrong_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.wrong_title)
+        layout.addSpacing(10)
+        
+        # Wrong answers grouped by fact; the view only renders visible rows
+        self.wrong_model = MistakeModel()
+        self.wrong_view = QTableView()
+        self.wrong_view.setModel(self.wrong_model)
+        self.wrong_view.setFont(font(24))
+        self.wrong_view.setMaximumHeight(200)
+        self.wrong_view.setSortingEnabled(True)
+        self.wrong_view.setShowGrid(False)
+        self.wrong_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.wrong_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.wrong_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.wrong_view.verticalHeader().hide()
+        self.wrong_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.wrong_view.verticalHeader().setDefaultSectionSize(40)
+        self.wrong_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.wrong_view.horizontalHeader().setFont(font(16, bold=True))
+        transparent_table(self.wrong_view)
+        layout.addWidget(self.wrong_view)
+        layout.addSpacing(10)
         
         layout.addSpacing(20)
 
-        restart_button = QPushButton("Joaca din nou")
-        restart_button.setFont(QFont("Helvetica", 24))
+        restart_button = ThemedButton("Joaca din nou", BUTTON_LIGHT)
+        restart_button.setFont(font(24))
         restart_button.setMinimumSize(250, 60)
-        restart_button.setStyleSheet("""
-            QPushButton {
-                background-color: #FFF9FB;
-                color: #000000;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #FFE6F0;
-            }
-        """)
         restart_button.clicked.connect(self.restart)
         layout.addWidget(restart_button, alignment=Qt.AlignmentFlag.AlignCenter)
         layout.addSpacing(15)
         
-        quit_button = QPushButton("Inapoi la Meniu")
-        quit_button.setFont(QFont("Helvetica", 24))
+        quit_button = ThemedButton("Inapoi la Meniu", BUTTON_SECONDARY)
+        quit_button.setFont(font(24))
         quit_button.setMinimumSize(250, 60)
-        quit_button.setStyleSheet("""
-            QPushButton {
-                background-color: #9C27B0;
-                color: #FFFFFF;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #AB47BC;
-            }
-        """)
         quit_button.clicked.connect(self.quit_to_menu)
         layout.addWidget(quit_button, alignment=Qt.AlignmentFlag.AlignCenter)
         layout.addSpacing(10)
         
-        exit_button = QPushButton("Inchide Aplicatia")
-        exit_button.setFont(QFont("Helvetica", 24))
+        exit_button = ThemedButton("Inchide Aplicatia", BUTTON_DANGER)
+        exit_button.setFont(font(24))
         exit_button.setMinimumSize(250, 60)
-        exit_button.setStyleSheet("""
-            QPushButton {
-                background-color: #E57373;
-                color: #FFFFFF;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #EF5350;
-            }
-        """)
         exit_button.clicked.connect(QApplication.quit)
         layout.addWidget(exit_button, alignment=Qt.AlignmentFlag.AlignCenter)
         
-        self.main_frame.setLayout(layout)
+        self.end_page.setLayout(layout)
+        self.main_frame.addWidget(self.end_page)
+
+    def show_end_screen(self):
+        summary = self.engine.summary()
+
+        self.congrats_label.setText(summary.congrats_text)
+        self.score_text_label.setText(f"Scorul tau este: {summary.score} puncte din {summary.total} ({summary.percentage:.2f}%)")
+        self.time_label.setText(f"Timp total: {format_time(summary.elapsed_time)}")
+
+        # Grouped per fact, so this costs the number of distinct facts, not answers
+        self.wrong_model.set_mistakes(summary.mistakes)
+        self.wrong_view.sortByColumn(MistakeModel.COUNT, Qt.SortOrder.DescendingOrder)
+        self.wrong_view.scrollToTop()
+        self.wrong_title.setVisible(bool(summary.mistakes))
+        self.wrong_view.setVisible(bool(summary.mistakes))
+
+        self.main_frame.setCurrentWidget(self.end_page)
 
     # ---------------- Restart ----------------
-    def quit_to_menu(self):
+    def stop(self):
+        self.set_state(STATE_IDLE)
         self.timer.stop()
-        self.start_menu = StartMenu()
-        self.start_menu.show()
-        self.close()
+        self.next_question_timer.stop()
+        self.star_overlay.clear()
+
+    def quit_to_menu(self):
+        self.stop()
+        self.abandon_session()
+        if self.archive is not None:
+            self.archive.flush()
+        self.save_log()
+        self.menu_requested.emit()
+
+    def abandon_session(self):
+        """Tell the history that the session in progress will never get a result."""
+        if self.history and self.session_id is not None:
+            self.history.abandon_session(self.session_id)
+        self.session_id = None
+
+    def save_log(self):
+        if self.log_saved or not self.log_dir or not len(self.engine.log.data):
+            return
+        self.log_saved = True
+        try:
+            save_log(self.engine.log, self.log_dir)
+        except OSError as error:
+            print(f"Nu am putut salva jurnalul sesiunii: {error}", file=sys.stderr)
     
     def restart(self):
-        self.score = 0
-        self.current_question = 0
-        self.wrong_answers = []
-        self.score_label.setText(f"Scor: {self.score}")
+        self.engine.reset(seed=self.session_seed)
+        self.engine.log.settings = self.settings._asdict() if self.settings else None
+        self.log_saved = False
+        self.star_rng.seed(self.engine.seed)
+        if self.history:
+            self.abandon_session()
+            self.session_id = self.history.begin_session(self.player, self.engine.total_questions or 0)
+        self.score_label.setText(f"Scor: {self.engine.score}")
         
-        # Reset timer
-        self.timer.stop()
-        self.start_time = None
-        self.elapsed_time = 0
+        # Reset timers
+        self.stop()
         self.timer_label.setText("Timp: 00:00")
+        self.shown_second = 0
 
-        # Rebuild the widgets
-        self.build_question_widgets()
+        # Back to the question page, reusing its widgets
+        self.main_frame.setCurrentWidget(self.question_page)
         self.new_question()
 
     # ---------------- Star Animation ----------------
     def spawn_stars(self):
         for _ in range(3):
-            x = random.randint(50, self.main_frame.width() - 50) if self.main_frame.width() > 100 else 50
-            y = random.randint(50, self.main_frame.height() - 50) if self.main_frame.height() > 100 else 50
+            x = self.star_rng.randint(50, self.main_frame.width() - 50) if self.main_frame.width() > 100 else 50
+            y = self.star_rng.randint(50, self.main_frame.height() - 50) if self.main_frame.height() > 100 else 50
+            self.star_overlay.spawn(x, y)
+
+
+# ---------------- Classroom Client ----------------
+class ClassroomClient(QObject):
+    """Connection to a classroom server (server.py): one JSON message per line."""
+
+    message_received = pyqtSignal(object)
+    connection_lost = pyqtSignal(str)
+
+    def __init__(self, host, port, parent=None):
+        super().__init__(parent)
+        from PyQt6.QtNetwork import QTcpSocket  # only classroom mode pays for the network module
+        self.socket = QTcpSocket(self)
+        self.socket.readyRead.connect(self.read_messages)
+        self.socket.errorOccurred.connect(lambda error: self.connection_lost.emit(self.socket.errorString()))
+        self.socket.connectToHost(host, port)
+
+    def wait_connected(self, msecs=3000):
+        return self.socket.waitForConnected(msecs)
+
+    def send(self, message):
+        from server import encode
+        self.socket.write(encode(message))
+
+    def read_messages(self):
+        from server import decode
+        while self.socket.canReadLine():
+            try:
+                message = decode(bytes(self.socket.readLine()))
+            except ValueError:
+                continue
+            self.message_received.emit(message)
+
 
-            star = QLabel("⭐", self.main_frame)
-            star.setFont(QFont("Helvetica", 30))
-            star.setStyleSheet("background: transparent;")
-            star.move(x, y)
-            star.show()
+class ClassroomQuiz(MultiplicationQuiz):
+    """Quiz screen whose questions come from a classroom server.
 
-            self.animate_star_label(star, 0)
+    The server owns the session: it picks the questions, scores the answers
+    and keeps the history. The local engine is only handed the questions it
+    receives, so the timer, feedback and end screen work exactly as offline.
+    """
 
-    def animate_star_label(self, star, step):
-        if step > 10:
-            star.deleteLater()
+    def __init__(self, client, player="", parent=None):
+        super().__init__(parent=parent)
+        self.client = client
+        self.player = player
+        self.starts_pending = 0  # questions for an older session are dropped
+        self.waiting = False
+        client.message_received.connect(self.handle_message)
+
+    def prepare_engine(self, settings):
+        self.engine.set_scheduler(None)
+
+    def restart(self):
+        settings = self.settings
+        self.client.send({"type": "start", "player": self.player, "total_questions": settings.total_questions,
+                          "tables": list(settings.tables), "max_operand": settings.max_operand,
+                          "mode": settings.mode})
+        self.starts_pending += 1
+        super().restart()
+
+    def new_question(self):
+        if self.engine.is_finished:
+            self.client.send({"type": "stop"})
+            self.finish_session()
             return
-        
-        current_pos = star.pos()
-        star.move(current_pos.x(), current_pos.y() - 8)
-        QTimer.singleShot(80, lambda: self.animate_star_label(star, step + 1))
+        self.waiting = True
+        self.client.send({"type": "next"})
+
+    def prefetch_question(self):
+        pass  # the server builds the next question as soon as it scores an answer
+
+    def check_answer(self, index):
+        if self.state == STATE_ASKING:
+            self.client.send({"type": "answer", "choice": index})
+        super().check_answer(index)
+
+    def submit_typed(self):
+        if self.state == STATE_ASKING and self.typed:
+            self.client.send({"type": "answer", "value": int(self.typed)})
+        super().submit_typed()
+
+    def stop(self):
+        self.waiting = False
+        super().stop()
+
+    def handle_message(self, message):
+        kind = message["type"]
+        if kind == "started":
+            self.starts_pending -= 1
+        elif kind == "question" and self.waiting and not self.starts_pending:
+            self.waiting = False
+            a, b = message["a"], message["b"]
+            question = Question(message["number"], a, b, a * b, message["choices"])
+            self.show_question(self.engine.present(question))
+        elif kind == "error":
+            self.feedback_label.setForegroundRole(ROLE_ERROR)
+            self.feedback_label.setText(message["message"])
+
+
+# ---------------- Visual Replay ----------------
+class ReplayQuiz(MultiplicationQuiz):
+    """Plays a recorded EventLog back on the quiz screen.
+
+    Events are shown at their recorded times divided by `speed`; + and -
+    double or halve the speed while it plays. The viewer's own clicks and
+    keys are ignored.
+    """
+
+    window_title = "Reluare: Tabla Inmultirii"
+
+    def __init__(self, log, speed=1.0, parent=None):
+        super().__init__(parent=parent)
+        self.log = log
+        self.speed = speed
+        self.session_seed = log.seed
+        self.replay_settings = SessionSettings()
+        self.shown_at = 0
+        self.events = []
+        self.position_ms = 0  # log time reached when the clock was last restarted
+        self.clock = QElapsedTimer()
+        self.event_timer = QTimer(self)
+        self.event_timer.setSingleShot(True)
+        self.event_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.event_timer.timeout.connect(self.play_event)
+
+    def prepare_engine(self, settings):
+        super().prepare_engine(settings._replace(mode=MODE_UNIFORM))  # questions come from the log
+
+    def start(self, settings=None):
+        if settings is None:
+            settings = SessionSettings(**self.log.settings) if self.log.settings else SessionSettings()
+        self.replay_settings = settings
+        super().start(settings._replace(feedback_delay=int(settings.feedback_delay / self.speed)))
+        self.done_button.hide()  # the log's own stop event ends a replayed drill
+
+    def restart(self):
+        self.events = list(self.log.events())
+        self.position_ms = 0
+        self.clock.start()
+        super().restart()
+
+    def stop(self):
+        self.event_timer.stop()
+        super().stop()
+
+    def position(self):
+        return self.position_ms + self.clock.elapsed() * self.speed
+
+    def set_speed(self, speed):
+        self.position_ms = self.position()
+        self.clock.restart()
+        self.speed = speed
+        self.feedback_delay = int(self.replay_settings.feedback_delay / speed)
+        if self.event_timer.isActive():
+            self.schedule_event()
+
+    def new_question(self):
+        self.schedule_event()
+
+    def schedule_event(self):
+        if not self.events:
+            if not self.engine.is_finished:
+                self.engine.stop()
+            self.finish_session()
+            return
+        self.event_timer.start(max(0, int((self.events[0][1] - self.position()) / self.speed)))
+
+    def play_event(self):
+        kind, t, *fields = self.events.pop(0)
+        if kind == EVENT_QUESTION:
+            a, b, *choices = fields
+            self.shown_at = t
+            self.show_question(self.engine.present(Question(self.engine.current_question + 1, a, b, a * b, choices)))
+            self.schedule_event()
+        elif kind == EVENT_ANSWER:
+            self.show_feedback(self.engine.submit_answer(fields[0], latency_ms=t - self.shown_at))
+        else:
+            self.engine.stop()
+            self.finish_session()
+
+    def prefetch_question(self):
+        pass
+
+    def check_answer(self, index):
+        pass
+
+    def submit_typed(self):
+        pass
+
+    def finish_drill(self):
+        pass
+
+    def keyPressEvent(self, event):
+        if event.text() == "+":
+            self.set_speed(self.speed * 2)
+        elif event.text() == "-":
+            self.set_speed(self.speed / 2)
+        else:
+            super().keyPressEvent(event)
 
 
 # Gradient widget for background
 class GradientWidget(QWidget):
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    first_frame = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # The cached background covers every pixel, so Qt need not erase first
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.background = None
+        self.background_key = None
+        self.painted = False
+
+    def render_background(self):
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(max(1, round(self.width() * dpr)), max(1, round(self.height() * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+
+        painter = QPainter(pixmap)
+        top, bottom = current_theme().background
         gradient = QLinearGradient(0, 0, 0, self.height())
-        gradient.setColorAt(0, QColor("#F48FB1"))
-        gradient.setColorAt(1, QColor("#F06292"))
+        gradient.setColorAt(0, top)
+        gradient.setColorAt(1, bottom)
         painter.fillRect(self.rect(), gradient)
+        painter.end()
+        return pixmap
+
+    def resizeEvent(self, event):
+        self.background = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        # Render once per size, DPR and theme, then only blit the exposed region
+        key = (self.width(), self.height(), self.devicePixelRatioF(), current_theme())
+        if self.background is None or key != self.background_key:
+            self.background = self.render_background()
+            self.background_key = key
+
+        painter = QPainter(self)
+        rect = event.rect()
+        dpr = self.background.devicePixelRatio()
+        source = QRectF(rect.x() * dpr, rect.y() * dpr, rect.width() * dpr, rect.height() * dpr)
+        painter.drawPixmap(QRectF(rect), self.background, source)
+
+        if not self.painted:
+            self.painted = True
+            self.first_frame.emit()
+
+
+# ---------------- Mastery Heatmap ----------------
+METRIC_ACCURACY, METRIC_MEAN, METRIC_P90, METRIC_TREND = "accuracy", "mean", "p90", "trend"
+HEATMAP_STOPS = ((0xC2, 0x18, 0x5B), (0xFF, 0xC1, 0xCC), (0x7C, 0xB3, 0x42))
+HEATMAP_EMPTY = QColor(255, 255, 255, 50)
+
+
+class MasteryHeatmap(QWidget):
+    """Multiplication table coloured by one mastery metric, drawn in a single paint pass."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(500, 500)
+        self.stats = None
+        self.metric = METRIC_ACCURACY
+        self.colors = []
+        self.texts = []
+        self.size_n = 0
+
+    def set_stats(self, stats):
+        self.stats = stats
+        self.refresh()
+
+    def set_metric(self, metric):
+        self.metric = metric
+        self.refresh()
+
+    def refresh(self):
+        """Recompute cell colours and labels; paintEvent only draws them."""
+        if self.stats is None:
+            return
+        import numpy as np  # loaded with the first progress screen, not at startup
+        if self.metric == METRIC_ACCURACY:
+            values = self.stats.accuracy()
+            goodness = values
+            texts = [f"{value:.0%}" for value in values.ravel()]
+        elif self.metric == METRIC_TREND:
+            values = self.stats.trend()
+            goodness = 0.5 + values
+            texts = [f"{value:+.2f}" for value in values.ravel()]
+        else:
+            values = self.stats.mean_latency() if self.metric == METRIC_MEAN else self.stats.latency_percentile(90)
+            goodness = 1 - (values - 1000) / 7000  # 1s or faster is best, 8s or slower worst
+            texts = [f"{value / 1000:.1f}s" for value in values.ravel()]
+
+        # Vectorized colour ramp: red (weak) -> pink -> green (mastered)
+        stops = np.array(HEATMAP_STOPS, dtype=float)
+        position = np.clip(np.nan_to_num(goodness, nan=0.0), 0, 1).ravel() * (len(stops) - 1)
+        low = np.minimum(position.astype(int), len(stops) - 2)
+        fraction = (position - low)[:, None]
+        rgb = (stops[low] * (1 - fraction) + stops[low + 1] * fraction).astype(int)
+
+        missing = np.isnan(values).ravel()
+        self.colors = [HEATMAP_EMPTY if empty else QColor(r, g, b) for (r, g, b), empty in zip(rgb.tolist(), missing)]
+        self.texts = ["" if empty else text for text, empty in zip(texts, missing)]
+        self.size_n = self.stats.size
+        self.update()
+
+    def paintEvent(self, event):
+        if not self.size_n:
+            return
+        painter = QPainter(self)
+        n = self.size_n
+        cell = min(self.width(), self.height()) / (n + 1)
+        left = (self.width() - cell * (n + 1)) / 2
+
+        painter.setFont(font(max(6, int(cell / 5))))
+        painter.setPen(self.palette().color(ROLE_TEXT))
+        for i in range(n):
+            header = str(i + 1)
+            painter.drawText(QRectF(left + (i + 1) * cell, 0, cell, cell), Qt.AlignmentFlag.AlignCenter, header)
+            painter.drawText(QRectF(left, (i + 1) * cell, cell, cell), Qt.AlignmentFlag.AlignCenter, header)
+
+        for index, (color, text) in enumerate(zip(self.colors, self.texts)):
+            row, column = divmod(index, n)
+            rect = QRectF(left + (column + 1) * cell + 1, (row + 1) * cell + 1, cell - 2, cell - 2)
+            painter.fillRect(rect, color)
+            if text:
+                painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+
+
+class MasteryScreen(QWidget):
+    menu_requested = pyqtSignal()
+
+    window_title = "Progres: Tabla Inmultirii"
+    window_minimum_size = (800, 850)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(30, 30, 30, 30)
+
+        title = QLabel("Cat de bine stii tabla")
+        title.setFont(font(36, bold=True))
+        title.setForegroundRole(ROLE_TEXT)
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+        layout.addSpacing(10)
+
+        # Metric selector
+        metric_row = QHBoxLayout()
+        metric_row.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.metric_buttons = QButtonGroup(self)
+        metrics = ((METRIC_ACCURACY, "Corectitudine"), (METRIC_MEAN, "Timp mediu"),
+                   (METRIC_P90, "Timp p90"), (METRIC_TREND, "Tendinta"))
+        for metric, text in metrics:
+            btn = ThemedButton(text, BUTTON_TOGGLE)
+            btn.setCheckable(True)
+            btn.setChecked(metric == METRIC_ACCURACY)
+            btn.setFont(font(16))
+            btn.setMinimumSize(150, 40)
+            btn.clicked.connect(lambda checked, m=metric: self.heatmap.set_metric(m))
+            self.metric_buttons.addButton(btn)
+            metric_row.addWidget(btn)
+        layout.addLayout(metric_row)
+        layout.addSpacing(10)
+
+        self.heatmap = MasteryHeatmap()
+        layout.addWidget(self.heatmap, stretch=1)
+        layout.addSpacing(10)
+
+        quit_button = ThemedButton("Inapoi la Meniu", BUTTON_SECONDARY)
+        quit_button.setFont(font(24))
+        quit_button.setMinimumSize(250, 60)
+        quit_button.clicked.connect(self.menu_requested.emit)
+        layout.addWidget(quit_button, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        self.setLayout(layout)
+
+    def set_stats(self, stats):
+        self.heatmap.set_stats(stats)
+
+
+# ---------------- Teacher Dashboard ----------------
+class ClassroomModel(QAbstractTableModel):
+    """Live score of every student connected to the classroom server."""
+
+    PLAYER, SCORE, ANSWERED, STATUS = range(4)
+    HEADERS = ["Elev", "Scor", "Raspunsuri", "Stare"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.students = []
+        self.rows = {}  # session id -> row
+
+    def set_students(self, students):
+        self.beginResetModel()
+        self.students = list(students)
+        self.rows = {student["session_id"]: row for row, student in enumerate(self.students)}
+        self.endResetModel()
+
+    def update_student(self, student):
+        row = self.rows.get(student["session_id"])
+        if row is None:
+            row = len(self.students)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.students.append(student)
+            self.rows[student["session_id"]] = row
+            self.endInsertRows()
+        else:
+            self.students[row] = student
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def student_left(self, session_id):
+        row = self.rows.get(session_id)
+        if row is not None:
+            self.update_student(dict(self.students[row], left=True))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.students)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        student = self.students[index.row()]
+        column = index.column()
+        if column == self.PLAYER:
+            return student["player"] or f"Elev {student['session_id']}"
+        if column == self.SCORE:
+            return str(student["score"])
+        if column == self.ANSWERED:
+            total = student["total"]
+            return f"{student['answered']}/{total}" if total else str(student["answered"])
+        if student.get("left"):
+            return "A iesit"
+        return "Terminat" if student["finished"] else "Lucreaza"
+
+
+class TeacherDashboard(QWidget):
+    window_title = "Clasa: Tabla Inmultirii"
+    window_minimum_size = (700, 500)
+
+    def __init__(self, client, parent=None):
+        super().__init__(parent)
+        self.client = client
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(30, 30, 30, 30)
+
+        title = QLabel("Clasa in timp real")
+        title.setFont(font(36, bold=True))
+        title.setForegroundRole(ROLE_TEXT)
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+        layout.addSpacing(10)
+
+        self.status_label = QLabel()
+        self.status_label.setFont(font(16))
+        self.status_label.setForegroundRole(ROLE_ERROR)
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.status_label)
+
+        self.model = ClassroomModel()
+        view = QTableView()
+        view.setModel(self.model)
+        view.setFont(font(20))
+        view.setShowGrid(False)
+        view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        view.verticalHeader().hide()
+        view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        view.verticalHeader().setDefaultSectionSize(36)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        view.horizontalHeader().setFont(font(16, bold=True))
+        transparent_table(view)
+        layout.addWidget(view, stretch=1)
+        self.setLayout(layout)
+
+        client.message_received.connect(self.handle_message)
+        client.connection_lost.connect(lambda error: self.status_label.setText(f"Conexiune pierduta: {error}"))
+        client.send({"type": "watch"})
+
+    def handle_message(self, message):
+        kind = message["type"]
+        if kind == "roster":
+            self.model.set_students(message["students"])
+        elif kind == "score":
+            self.model.update_student(message)
+        elif kind == "left":
+            self.model.student_left(message["session_id"])
+
+
+# ---------------- Profiling ----------------
+STALL_PROBE_MS = 20
+STALL_MIN_MS = 5  # lateness below this is timer jitter, not a stall
+OVERLAY_REFRESH_MS = 500
+FRAME_PROBE = "GradientWidget.paintEvent"  # every repaint of the window exposes the background
+STALL_PROBE = "event loop stall"
+
+
+class EventLoopProbe(QObject):
+    """Measures how late a short repeating timer fires; the delay is time the event loop was blocked."""
+
+    def __init__(self, profiler, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.clock = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(STALL_PROBE_MS)
+        self.timer.timeout.connect(self.check)
+        self.clock.start()
+        self.timer.start()
+
+    def check(self):
+        late_ms = self.clock.restart() - STALL_PROBE_MS
+        if late_ms >= STALL_MIN_MS:
+            now = time.perf_counter()
+            self.profiler.record(STALL_PROBE, now - late_ms / 1000, late_ms / 1000)
+
+
+class ProfilerOverlay(QWidget):
+    """FPS and the slowest probes in the window corner; F3 shows and hides it."""
+
+    def __init__(self, profiler, parent):
+        super().__init__(parent)
+        # Opaque, so refreshing it does not repaint the background and skew the FPS
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.profiler = profiler
+        self.lines = []
+        self.timer = QTimer(self)
+        self.timer.setInterval(OVERLAY_REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.setFont(font(10))
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.raise_()
+            self.show()
+            self.timer.start()
+
+    def refresh(self):
+        self.lines = [f"FPS {self.profiler.rate(FRAME_PROBE):.0f}"]
+        for name, stats in self.profiler.worst():
+            self.lines.append(f"{name}: p95 {stats['p95_ms']:.2f} ms, max {stats['max_ms']:.2f} ms, {stats['count']}x")
+        metrics = QFontMetrics(self.font())
+        width = max(metrics.horizontalAdvance(line) for line in self.lines)
+        self.setGeometry(4, 4, width + 12, metrics.lineSpacing() * len(self.lines) + 8)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.GlobalColor.black)
+        painter.setPen(Qt.GlobalColor.white)
+        metrics = QFontMetrics(self.font())
+        for row, line in enumerate(self.lines):
+            painter.drawText(6, 4 + metrics.ascent() + row * metrics.lineSpacing(), line)
+
+
+def enable_profiling():
+    """Start the profiler and time the paint, timer and question hot paths from now on."""
+    profiler = profiling.start()
+    for owner, attribute in ((HeartButton, "paintEvent"), (GradientWidget, "paintEvent"),
+                             (StarOverlay, "advance"), (StarOverlay, "paintEvent"), (AnimationScheduler, "tick"),
+                             (MultiplicationQuiz, "update_timer"), (MultiplicationQuiz, "new_question"),
+                             (ClassroomQuiz, "new_question"), (ReplayQuiz, "new_question")):
+        profiler.instrument(owner, attribute)
+    return profiler
+
+
+def replay_speed(text):
+    speed = float(text)
+    if not speed > 0:
+        raise argparse.ArgumentTypeError("viteza trebuie sa fie mai mare decat 0")
+    return speed
+
+
+def print_profile(profiler):
+    print(f"FPS in ultima secunda: {profiler.rate(FRAME_PROBE):.0f}")
+    for name, stats in profiler.worst(limit=len(profiler.probes)):
+        print(f"  {name}: {stats['count']}x, medie {stats['mean_ms']:.3f} ms, "
+              f"p95 {stats['p95_ms']:.3f} ms, max {stats['max_ms']:.3f} ms")
+
+
+# ---------------- Main Window ----------------
+class MainWindow(QMainWindow):
+    """Single window holding every screen in a persistent stack.
+
+    Only the menu is built up front. The remembered profile is opened, and
+    the quiz screen built and rendered once off screen, in idle time after
+    the menu's first frame; the progress screen is built on first use.
+    """
+
+    prewarmed = pyqtSignal()
+
+    def __init__(self, history=None, client=None, player="", log_dir=None, profile_dir=None):
+        super().__init__()
+        self.setGeometry(100, 100, 600, 780)
+        self.menu_size = None
+        self.history = history
+        self.client = client
+        self.player = player
+        self.log_dir = log_dir
+        self.profile_dir = profile_dir
+        self.archive = None
+        self.pending_profile = None
+
+        # Central widget with gradient background, shared by all screens
+        self.central_widget = GradientWidget()
+        self.setCentralWidget(self.central_widget)
+
+        self.screens = QStackedWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.screens)
+        self.central_widget.setLayout(layout)
+
+        self.start_menu = StartMenu()
+        self.start_menu.quiz_requested.connect(self.start_quiz)
+        self.start_menu.mastery_requested.connect(self.show_mastery)
+        self.screens.addWidget(self.start_menu)
+
+        self.quiz = None
+        if client is not None:
+            client.connection_lost.connect(self.connection_lost)
+
+        # Mastery aggregates are loaded on first use, then updated per session
+        self.mastery = None
+        self.mastery_screen = None
+
+        if profile_dir is not None:
+            profiles = list_profiles(profile_dir)
+            self.pending_profile = last_profile(profile_dir) or (profiles[0] if profiles else DEFAULT_PROFILE)
+            self.start_menu.show_profiles(profiles, self.pending_profile)
+            self.start_menu.profile_selected.connect(self.select_profile)
+
+        self.show_screen(self.start_menu)
+        self.central_widget.first_frame.connect(lambda: QTimer.singleShot(0, self.open_pending_profile))
+        self.central_widget.first_frame.connect(lambda: QTimer.singleShot(0, self.prewarm))
+
+        profiler = profiling.profiler()
+        if profiler is not None:
+            self.stall_probe = EventLoopProbe(profiler, self)
+            self.profiler_overlay = ProfilerOverlay(profiler, self.central_widget)
+            QShortcut(QKeySequence("F3"), self, self.profiler_overlay.toggle)
+
+    def add_screen(self, screen):
+        # Hidden screens must not impose their minimum size on the window
+        policy = QSizePolicy.Policy.Ignored
+        screen.setSizePolicy(policy, policy)
+        self.screens.addWidget(screen)
+
+    def open_pending_profile(self):
+        """Open the remembered profile; a new one imports the history, so this waits for the first frame."""
+        name, self.pending_profile = self.pending_profile, None
+        # A damaged remembered profile must not keep the app from starting
+        if name is not None and not self.select_profile(name) and name != DEFAULT_PROFILE:
+            self.select_profile(DEFAULT_PROFILE)
+
+    def select_profile(self, name):
+        """Switch to profile `name`; if it cannot be opened the current one stays and False is returned."""
+        self.pending_profile = None  # a profile picked before startup finished wins
+        if self.archive is not None and name == self.player:
+            return True
+        if self.quiz is not None and self.quiz.state != STATE_IDLE:
+            return False  # profiles only change from the menu
+        try:
+            archive = open_profile(name, self.profile_dir, self.history)
+        except (OSError, ValueError) as error:
+            self.start_menu.error_label.setText(f"Profilul {name} nu se poate deschide: {error}")
+            self.start_menu.show_profiles(list_profiles(self.profile_dir), self.player)
+            return False
+        self.close_profile()
+        self.archive = archive
+        self.player = name
+        self.mastery = None
+        if self.quiz is not None:
+            self.quiz.set_profile(name, self.archive)
+        set_last_profile(name, self.profile_dir)
+        self.start_menu.show_profiles(list_profiles(self.profile_dir), name)
+        return True
+
+    def close_profile(self):
+        if self.archive is not None:
+            self.archive.close()
+
+    def quiz_screen(self):
+        if self.quiz is None:
+            if self.client is None:
+                self.quiz = MultiplicationQuiz(history=self.history, log_dir=self.log_dir)
+                if self.archive is not None:
+                    self.quiz.set_profile(self.player, self.archive)
+            else:
+                # Questions, scoring and history live on the classroom server
+                self.quiz = ClassroomQuiz(self.client, self.player)
+            self.quiz.menu_requested.connect(self.show_menu)
+            self.quiz.session_finished.connect(self.update_mastery)
+            self.add_screen(self.quiz)
+        return self.quiz
+
+    def prewarm(self):
+        """Build the quiz screen while the menu sits idle, so the first click only switches to it."""
+        if self.quiz is None and self.screens.currentWidget() is self.start_menu:
+            self.quiz_screen()
+            QTimer.singleShot(0, self.prewarm_render)
+        else:
+            self.prewarmed.emit()
+
+    def prewarm_render(self):
+        # Lay out and paint the quiz once off screen, filling the heart, font and glyph caches
+        quiz = self.quiz
+        quiz.resize(*quiz.window_minimum_size)
+        quiz.grab()
+        self.prewarmed.emit()
+
+    def show_screen(self, screen):
+        # Hidden screens must not impose their minimum size on the window
+        for index in range(self.screens.count()):
+            page = self.screens.widget(index)
+            policy = QSizePolicy.Policy.Preferred if page is screen else QSizePolicy.Policy.Ignored
+            page.setSizePolicy(policy, policy)
+
+        self.setWindowTitle(screen.window_title)
+        self.setMinimumSize(*screen.window_minimum_size)
+        self.screens.setCurrentWidget(screen)
+
+    def start_quiz(self, settings):
+        self.open_pending_profile()  # clicked before the idle load ran
+        quiz = self.quiz_screen()
+        self.menu_size = self.size()
+        self.show_screen(quiz)
+        quiz.start(settings)
+
+    def show_menu(self):
+        self.show_screen(self.start_menu)
+        if self.menu_size is not None:
+            self.resize(self.menu_size)
+
+    def show_mastery(self):
+        self.open_pending_profile()
+        if self.mastery is None:
+            from analytics import MasteryStats, load_mastery  # NumPy loads here, not at startup
+            if self.archive is not None:
+                self.mastery = self.archive.mastery()
+            elif self.history:
+                self.history.flush()
+                self.mastery = load_mastery(self.history, self.player)
+            else:
+                self.mastery = MasteryStats()
+        if self.mastery_screen is None:
+            self.mastery_screen = MasteryScreen()
+            self.mastery_screen.menu_requested.connect(self.show_menu)
+            self.add_screen(self.mastery_screen)
+        self.mastery_screen.set_stats(self.mastery)
+        self.menu_size = self.size()
+        self.show_screen(self.mastery_screen)
+
+    def update_mastery(self, summary):
+        if self.mastery is not None:
+            self.mastery.update_from_log(summary.answers)
+
+    def connection_lost(self, error):
+        if self.quiz is not None:
+            self.quiz.stop()
+        self.show_menu()
+        self.start_menu.error_label.setText(f"Fara legatura cu serverul: {error}")
+
+    def show_dashboard(self, dashboard):
+        self.add_screen(dashboard)
+        self.show_screen(dashboard)
+
+    def show_replay(self, log, speed=1.0):
+        replay = ReplayQuiz(log, speed)
+        replay.menu_requested.connect(self.show_menu)
+        self.add_screen(replay)
+        self.menu_size = self.size()
+        self.show_screen(replay)
+        replay.start()
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    start_menu = StartMenu()
-    start_menu.show()
+    parser = argparse.ArgumentParser(description="Test de tabla inmultirii")
+    parser.add_argument("--server", metavar="HOST:PORT", help="joaca pe serverul clasei (server.py)")
+    parser.add_argument("--player", default="", help="numele elevului, trimis serverului")
+    parser.add_argument("--teacher", action="store_true", help="arata scorurile clasei de pe server")
+    parser.add_argument("--replay", metavar="LOG", help="reia o sesiune inregistrata (vezi replay.py)")
+    parser.add_argument("--speed", type=replay_speed, default=1.0, help="viteza reluarii; + si - o schimba in timpul ei")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"masoara timpii de desenare si blocajele (si {profiling.PROFILE_ENV}=1); F3 arata masuratorile")
+    parser.add_argument("--profile-out", metavar="FILE", help="la iesire scrie masuratorile aici")
+    parser.add_argument("--profile-format", choices=(profiling.FORMAT_JSON, profiling.FORMAT_CHROME),
+                        default=profiling.FORMAT_JSON, help="chrome se deschide in chrome://tracing sau Perfetto")
+    parser.add_argument("--startup-report", action="store_true", help="arata cat dureaza fiecare etapa a pornirii")
+    args, qt_args = parser.parse_known_args()
+    startup = profiling.StartupTimer(STARTED)
+    startup.mark("importuri")
+    app = QApplication(sys.argv[:1] + qt_args)
+    apply_theme(app)
+    startup.mark("QApplication si tema")
+
+    if args.profile or args.profile_out or profiling.enabled():
+        profiler = enable_profiling()
+        if args.profile_out:
+            app.aboutToQuit.connect(lambda: profiler.save(args.profile_out, args.profile_format))
+        else:
+            app.aboutToQuit.connect(lambda: print_profile(profiler))
+
+    if args.server or args.teacher:
+        from server import DEFAULT_HOST, DEFAULT_PORT
+        host, _, port = (args.server or f"{DEFAULT_HOST}:{DEFAULT_PORT}").rpartition(":")
+        client = ClassroomClient(host or DEFAULT_HOST, int(port))
+        if not client.wait_connected():
+            sys.exit(f"Nu ma pot conecta la server: {client.socket.errorString()}")
+        main_window = MainWindow(client=client, player=args.player)
+        if args.teacher:
+            main_window.show_dashboard(TeacherDashboard(client))
+    elif args.replay:
+        main_window = MainWindow()
+        main_window.show_replay(EventLog.load(args.replay), args.speed)
+    else:
+        history = HistoryStore()
+        app.aboutToQuit.connect(history.close)
+        startup.mark("istoric")
+        main_window = MainWindow(history, log_dir=LOG_DIR, profile_dir=PROFILE_DIR)
+        app.aboutToQuit.connect(main_window.close_profile)
+    startup.mark("meniu")
+
+    if args.startup_report:
+        main_window.central_widget.first_frame.connect(lambda: startup.mark("primul cadru"))
+
+        def report():
+            startup.mark("test pregatit")
+            print("Pornire:")
+            print("\n".join(startup.lines()))
+        main_window.prewarmed.connect(report)
+    main_window.show()
     sys.exit(app.exec())
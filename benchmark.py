@@ -0,0 +1,279 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt6.QtCore import qInstallMessageHandler
+from PyQt6.QtWidgets import QApplication
+
+import app
+from quiz_engine import SessionSettings
+
+
+REPEAT = 50
+COLD_START_REPEAT = 5
+WINDOW_SIZES = ((600, 780), (1200, 950), (1920, 1080))
+HEART_SIZES = ((220, 200), (300, 260))
+WRONG_COUNTS = (0, 100, 10000)
+SESSION_QUESTIONS = 100
+TOLERANCE = 0.2  # slower than the baseline by more than this is a regression
+FIRST_FRAME = "first-frame"
+OFFSCREEN_NOISE = "This plugin does not support"  # masks and size hints the offscreen platform ignores
+
+# What `python app.py` does up to the menu's first frame, in an interpreter
+# that imports nothing but app; the benchmark's own imports (NumPy among
+# them) would otherwise hide the very startup cost being measured
+COLD_START_CHILD = f"""
+import os, sys
+from PyQt6.QtCore import qInstallMessageHandler
+from PyQt6.QtWidgets import QApplication
+import app
+qInstallMessageHandler(lambda kind, context, message: message.startswith({OFFSCREEN_NOISE!r}) or print(message, file=sys.stderr))
+qt = QApplication(sys.argv[:1])
+app.apply_theme(qt)
+window = app.MainWindow(app.HistoryStore(), log_dir=app.LOG_DIR, profile_dir=app.PROFILE_DIR)
+def first_frame():
+    print({FIRST_FRAME!r}, flush=True)
+    os._exit(0)
+window.central_widget.first_frame.connect(first_frame)
+window.show()
+qt.exec()
+"""
+
+
+def quiet_offscreen(kind, context, message):
+    if not message.startswith(OFFSCREEN_NOISE):
+        print(message, file=sys.stderr)
+
+
+# ---------------- Timing ----------------
+def measure(run, repeat, setup=None):
+    """Seconds per call of run(), each preceded by an untimed setup()."""
+    times = np.empty(repeat)
+    for i in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        times[i] = time.perf_counter() - started
+    return times
+
+
+def result(times):
+    ms = times * 1000
+    return {"median_ms": float(np.median(ms)), "min_ms": float(ms.min()),
+            "p95_ms": float(np.percentile(ms, 95)), "runs": len(ms)}
+
+
+# ---------------- Benchmarks ----------------
+def bench_heart_button(qt, repeat):
+    results = {}
+    button = app.HeartButton("42")
+    button.setFont(app.font(28, bold=True))
+    button.resize(*HEART_SIZES[0])
+    button.show()
+    qt.processEvents()
+
+    results["heart paint"] = result(measure(button.repaint, repeat))
+    button.is_hovered = True
+    results["heart paint hovered"] = result(measure(button.repaint, repeat))
+    button.is_hovered = False
+
+    sizes = iter(HEART_SIZES * repeat)
+    results["heart resize"] = result(measure(lambda: button.resize(*next(sizes)), repeat))
+    results["heart resize uncached"] = result(measure(lambda: button.resize(*next(sizes)), repeat,
+                                                      setup=app._heart_cache.clear))
+    button.close()
+    return results
+
+
+def bench_gradient(qt, repeat):
+    results = {}
+    widget = app.GradientWidget()
+    widget.show()
+    for width, height in WINDOW_SIZES:
+        widget.resize(width, height)
+        qt.processEvents()
+        results[f"gradient paint {width}x{height}"] = result(measure(widget.repaint, repeat))
+
+        def invalidate():
+            widget.background = None
+        results[f"gradient first paint {width}x{height}"] = result(measure(widget.repaint, repeat, setup=invalidate))
+    widget.close()
+    return results
+
+
+def answer_questions(engine, total, wrong):
+    """Finish a session of `total` answers, the first `wrong` of them wrong, without any widgets."""
+    engine.reset(total)
+    while True:
+        question = engine.new_question()
+        if question is None:
+            return
+        engine.submit_answer(question.correct + (1 if len(engine.answers) < wrong else 0))
+
+
+def bench_screens(qt, repeat):
+    results = {}
+    window = app.MainWindow()
+    window.show()
+    window.start_quiz(SessionSettings(10, feedback_delay=0))
+    qt.processEvents()
+    quiz = window.quiz_screen()
+
+    # A scratch quiz whose pages can be rebuilt freely; each run adds one page and the setup drops it
+    scratch = app.MultiplicationQuiz()
+
+    def drop_page():
+        page = scratch.question_page
+        scratch.main_frame.removeWidget(page)
+        page.deleteLater()
+        qt.processEvents()
+    results["build question widgets"] = result(measure(scratch.build_question_widgets, repeat, setup=drop_page))
+    scratch.deleteLater()
+
+    for wrong in WRONG_COUNTS:
+        answer_questions(quiz.engine, max(wrong, 10), wrong)
+
+        def show():
+            quiz.show_end_screen()
+            window.repaint()
+
+        def back():
+            quiz.main_frame.setCurrentWidget(quiz.question_page)
+        results[f"end screen {wrong} wrong"] = result(measure(show, max(1, repeat // 5), setup=back))
+    window.close()
+    return results
+
+
+def bench_session(qt, repeat):
+    window = app.MainWindow()
+    window.show()
+    qt.processEvents()
+    quiz = window.quiz_screen()
+    rng = random.Random(1)
+
+    def play():
+        window.start_quiz(SessionSettings(SESSION_QUESTIONS, feedback_delay=0))
+        while quiz.state == app.STATE_ASKING:
+            quiz.check_answer(rng.randrange(len(quiz.buttons)))
+            qt.processEvents()
+
+    def clear():
+        quiz.quit_to_menu()
+        qt.processEvents()
+    times = measure(play, max(1, repeat // 10), setup=clear)
+    window.close()
+    return {f"session {SESSION_QUESTIONS} questions": result(times)}
+
+
+def bench_cold_start(qt, repeat):
+    """Process launch to the first painted frame, in a fresh interpreter each time, on an empty history."""
+    times = np.empty(COLD_START_REPEAT)
+    here = os.path.dirname(os.path.abspath(__file__))
+    for i in range(COLD_START_REPEAT):
+        with tempfile.TemporaryDirectory() as directory:
+            environment = dict(os.environ, TABLA_HISTORY=os.path.join(directory, "history.sqlite3"),
+                               TABLA_LOGS=os.path.join(directory, "sessions"),
+                               TABLA_PROFILES=os.path.join(directory, "profiles"))
+            started = time.perf_counter()
+            child = subprocess.Popen([sys.executable, "-c", COLD_START_CHILD], cwd=here, env=environment,
+                                     stdout=subprocess.PIPE, text=True)
+            line = child.stdout.readline()
+            times[i] = time.perf_counter() - started
+            child.kill()
+            child.wait()
+        if line.strip() != FIRST_FRAME:
+            raise RuntimeError("cold start child did not paint a frame")
+    return {"cold start to first frame": result(times)}
+
+
+BENCHMARKS = {
+    "heart": bench_heart_button,
+    "gradient": bench_gradient,
+    "screens": bench_screens,
+    "session": bench_session,
+    "startup": bench_cold_start,
+}
+
+
+# ---------------- Report ----------------
+def run_benchmarks(repeat=REPEAT, groups=None):
+    qInstallMessageHandler(quiet_offscreen)
+    qt = QApplication.instance() or QApplication(sys.argv[:1])
+    app.apply_theme(qt)
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if not groups or name in groups:
+            results.update(bench(qt, repeat))
+    return {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "qt_platform": qt.platformName(), "cpus": os.cpu_count()},
+        "timestamp": time.time(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """Lines describing how each median moved against `baseline`, and the names that regressed."""
+    lines, regressions = [], []
+    for name, new in report["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            lines.append(f"  {name}: {new['median_ms']:.3f} ms (nou)")
+            continue
+        change = (new["median_ms"] - old["median_ms"]) / old["median_ms"] if old["median_ms"] else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  <-- mai lent"
+        lines.append(f"  {name}: {new['median_ms']:.3f} ms vs {old['median_ms']:.3f} ms ({change:+.1%}){flag}")
+    return lines, regressions
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("trebuie sa fie cel putin 1")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Masuratori fara ecran pentru desenare, ecrane si pornire")
+    parser.add_argument("--repeat", type=positive_int, default=REPEAT, help="repetari per masuratoare")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="ruleaza doar aceste grupuri")
+    parser.add_argument("--output", help="scrie raportul JSON aici (de exemplu ca referinta)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compara cu un raport JSON anterior")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="cat de mult mai lent (fractie) e acceptat fata de referinta")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.repeat, args.only)
+    for name, stats in report["results"].items():
+        print(f"{name}: median {stats['median_ms']:.3f} ms, min {stats['min_ms']:.3f} ms, "
+              f"p95 {stats['p95_ms']:.3f} ms ({stats['runs']}x)")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        lines, regressions = compare(report, baseline, args.tolerance)
+        print(f"Fata de {args.compare}:")
+        print("\n".join(lines))
+        if regressions:
+            sys.exit(f"{len(regressions)} masuratori mai lente decat referinta cu peste {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
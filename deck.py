@@ -0,0 +1,63 @@
+import random
+from functools import lru_cache
+
+
+MAX_TABLE_SIZE = 20
+
+
+def table_facts(tables, max_operand):
+    """Facts a × b for every a in `tables` and b in 1..max_operand.
+
+    The tuple is shared by every caller asking for the same selection, so a
+    server with many sessions on the same tables holds their facts once.
+    """
+    return _table_facts(tuple(sorted(set(tables))), max_operand)
+
+
+@lru_cache(maxsize=32)
+def _table_facts(tables, max_operand):
+    return tuple((a, b) for a in tables for b in range(1, max_operand + 1))
+
+
+def parse_tables(text, limit=MAX_TABLE_SIZE):
+    """Parse a table selection such as "1-10", "7, 8" or "2, 5-7" into a sorted list.
+
+    Raises ValueError for anything outside 1..limit or not a number/range.
+    """
+    tables = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        low = int(low)
+        high = int(high) if high else low
+        if not 1 <= low <= high <= limit:
+            raise ValueError(f"tabla in afara intervalului 1-{limit}: {part}")
+        tables.update(range(low, high + 1))
+    if not tables:
+        raise ValueError("nicio tabla aleasa")
+    return sorted(tables)
+
+
+def fact_deck(facts, rng=random):
+    """Endless stream of facts: shuffled, no repeats until the deck runs out.
+
+    The shuffle is a lazy Fisher-Yates done in place one draw at a time, so a
+    reshuffle costs nothing up front and memory is the size of the table no
+    matter how long the drill runs. The first fact of a new pass is never the
+    last fact of the previous one.
+    """
+    deck = list(facts)
+    size = len(deck)
+    if not size:
+        return
+    last = None
+    while True:
+        for i in range(size):
+            j = i + int(rng.random() * (size - i))
+            deck[i], deck[j] = deck[j], deck[i]
+            if i == 0 and deck[0] == last and size > 1:
+                j = 1 + int(rng.random() * (size - 1))
+                deck[0], deck[j] = deck[j], deck[0]
+            last = deck[i]
+            yield last
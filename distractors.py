@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+
+INDEX_CACHE_SIZE = 16
+
+_index_cache = OrderedDict()
+
+
+class DistractorIndex:
+    """Plausible wrong answers for each multiplication fact.
+
+    Every fact (a, b) maps to a short, precomputed tuple of near misses:
+    neighbouring facts (a±1)×b and a×(b±1), the product with its digits
+    swapped and the a+b mix-up. Small off-by-one / off-by-ten values are kept
+    as a fallback for facts with too few near misses (1×1, 1×2, ...). The
+    candidate lists have a fixed maximum length, so picking k distractors
+    costs the same for any table size.
+    """
+
+    def __init__(self, facts=()):
+        self.index = {}
+        for a, b in facts:
+            self.candidates(a, b)
+
+    def candidates(self, a, b):
+        entry = self.index.get((a, b))
+        if entry is None:
+            entry = self.index[(a, b)] = self.build(a, b)
+        return entry
+
+    @staticmethod
+    def build(a, b):
+        correct = a * b
+        near = [(a - 1) * b, (a + 1) * b, a * (b - 1), a * (b + 1), a + b]
+
+        # Swapped digits, e.g. 56 -> 65 (skip 40 -> 04)
+        if correct >= 10 and correct % 10:
+            near.append(int(str(correct)[::-1]))
+
+        fallback = [correct + 1, correct - 1, correct + 10, correct - 10, correct + 2, correct - 2, correct + 3]
+
+        seen = {correct}
+        primary = []
+        for value in near:
+            if value > 0 and value not in seen:
+                seen.add(value)
+                primary.append(value)
+        extra = []
+        for value in fallback:
+            if value > 0 and value not in seen:
+                seen.add(value)
+                extra.append(value)
+        return tuple(primary), tuple(extra)
+
+    def pick(self, a, b, k, rng):
+        """Return `k` unique distractors for a×b, near misses first."""
+        primary, extra = self.candidates(a, b)
+        if len(primary) >= k:
+            return rng.sample(primary, k)
+        return list(primary) + list(extra[:k - len(primary)])
+
+
+def distractor_index(facts):
+    """Shared DistractorIndex for a fact set, so sessions on the same tables reuse it."""
+    key = tuple(facts)
+    index = _index_cache.get(key)
+    if index is None:
+        index = _index_cache[key] = DistractorIndex(key)
+        if len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    else:
+        _index_cache.move_to_end(key)
+    return index
@@ -0,0 +1,264 @@
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import ChainMap
+from itertools import count
+
+
+DEFAULT_PATH = os.environ.get(
+    "TABLA_HISTORY", os.path.join(os.path.expanduser("~"), ".tabla_inmultirii", "history.sqlite3"))
+BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    total_questions INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS answers (
+    session_id INTEGER NOT NULL,
+    a INTEGER NOT NULL,
+    b INTEGER NOT NULL,
+    user_answer INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    latency_ms INTEGER NOT NULL,
+    answered_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_session ON answers (session_id);
+CREATE TABLE IF NOT EXISTS results (
+    session_id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    elapsed REAL NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fact_stats (
+    player TEXT NOT NULL,
+    a INTEGER NOT NULL,
+    b INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    latency_total_ms INTEGER NOT NULL,
+    PRIMARY KEY (player, a, b)
+) WITHOUT ROWID;
+"""
+
+UPSERT_FACT = """
+INSERT INTO fact_stats (player, a, b, attempts, errors, latency_total_ms) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (player, a, b) DO UPDATE SET
+    attempts = attempts + excluded.attempts,
+    errors = errors + excluded.errors,
+    latency_total_ms = latency_total_ms + excluded.latency_total_ms
+"""
+
+
+class FactStats:
+    """Lifetime attempts, errors and latency for one fact."""
+
+    __slots__ = ("attempts", "errors", "latency_total_ms")
+
+    def __init__(self, attempts=0, errors=0, latency_total_ms=0):
+        self.attempts = attempts
+        self.errors = errors
+        self.latency_total_ms = latency_total_ms
+
+    @property
+    def mean_latency_ms(self):
+        return self.latency_total_ms / self.attempts if self.attempts else 0.0
+
+    def add(self, correct, latency_ms):
+        self.attempts += 1
+        self.errors += not correct
+        self.latency_total_ms += latency_ms
+
+
+class HistoryQueries:
+    """Read queries over the history tables; needs `connection` and `lock`."""
+
+    def players(self):
+        """Every player with at least one finished session, in name order."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT s.player FROM sessions s JOIN results r ON r.session_id = s.id ORDER BY s.player"
+            ).fetchall()
+        return [player for player, in rows]
+
+    def fact_stats(self, player=""):
+        """Lifetime FactStats per (a, b) for `player`, read from the fact index."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT a, b, attempts, errors, latency_total_ms FROM fact_stats WHERE player = ?", (player,)
+            ).fetchall()
+        return {(a, b): FactStats(attempts, errors, latency) for a, b, attempts, errors, latency in rows}
+
+    def sessions(self, player="", since=0.0):
+        """Finished sessions for `player` as (id, started_at, total_questions, answered, score, elapsed), oldest first.
+
+        `answered` counts the stored answers; total_questions is 0 for endless
+        drills. `since` (unix time) skips sessions started before it, e.g. to
+        report on one term.
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT s.id, s.started_at, s.total_questions, "
+                "(SELECT COUNT(*) FROM answers ans WHERE ans.session_id = s.id), r.score, r.elapsed "
+                "FROM sessions s JOIN results r ON r.session_id = s.id "
+                "WHERE s.player = ? AND s.started_at >= ? ORDER BY s.id",
+                (player, since)
+            ).fetchall()
+
+    def answer_records(self, player="", since=0.0, finished=False):
+        """(a, b, user_answer, correct, latency_ms, answered_at) for every answer of `player`, oldest first.
+
+        With `finished`, only answers from the sessions sessions() returns are
+        included, leaving out drills that were quit or cut off.
+        """
+        results = "JOIN results r ON r.session_id = s.id " if finished else ""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT ans.a, ans.b, ans.user_answer, ans.correct, ans.latency_ms, ans.answered_at "
+                "FROM answers ans JOIN sessions s ON s.id = ans.session_id " + results +
+                "WHERE s.player = ? AND s.started_at >= ? ORDER BY ans.rowid",
+                (player, since)
+            ).fetchall()
+
+    def answer_rows(self, player="", after_rowid=0):
+        """(rowid, a, b, correct, latency_ms) for `player`'s answers newer than `after_rowid`, oldest first."""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT ans.rowid, ans.a, ans.b, ans.correct, ans.latency_ms "
+                "FROM answers ans JOIN sessions s ON s.id = ans.session_id "
+                "WHERE s.player = ? AND ans.rowid > ? ORDER BY ans.rowid",
+                (player, after_rowid)
+            ).fetchall()
+
+
+class HistoryStore(HistoryQueries):
+    """Append-only SQLite history of sessions and answers.
+
+    Calls from the UI only enqueue rows; a background thread writes them in
+    batched transactions and keeps the per-fact `fact_stats` table up to date,
+    so lifetime statistics are a single small indexed read.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        # Callers get provisional session ids at once; SQLite assigns the real
+        # ones when the writer inserts the session, so several stores (the app
+        # and the classroom server) can share one file
+        self.provisional_ids = count(1)
+        self.session_ids = {}  # provisional id -> row id, used by the writer thread only
+        self.session_players = {}
+
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name="history-writer", daemon=True)
+        self.writer.start()
+
+    # ---------------- Recording ----------------
+    def begin_session(self, player, total_questions):
+        session_id = next(self.provisional_ids)
+        self.session_players[session_id] = player
+        self.pending.put(("session", (session_id, player, time.time(), total_questions)))
+        return session_id
+
+    def record_answer(self, session_id, a, b, user_answer, correct, latency_ms):
+        self.pending.put(("answer", (session_id, a, b, user_answer, int(correct), latency_ms, time.time())))
+
+    def finish_session(self, session_id, score, elapsed):
+        self.pending.put(("result", (session_id, score, elapsed, time.time())))
+
+    def abandon_session(self, session_id):
+        """Forget a session that will never finish; its answers so far are kept."""
+        self.pending.put(("abandon", session_id))
+
+    # ---------------- Writer Thread ----------------
+    def write_loop(self):
+        while True:
+            batch = [self.pending.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = any(item is None for item in batch)
+            try:
+                self.write_batch([item for item in batch if item is not None])
+            except sqlite3.Error as error:
+                # Losing one batch beats a dead writer that loses everything after it and hangs flush()
+                print(f"history: {len(batch)} rows not saved: {error}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+            if closing:
+                return
+
+    def write_batch(self, batch):
+        sessions, answers, results, abandoned = [], [], [], []
+        facts = {}
+        for kind, row in batch:
+            if kind == "answer":
+                answers.append(row)
+                session_id, a, b, _, correct, latency_ms, _ = row
+                key = (self.session_players.get(session_id, ""), a, b)
+                attempts, errors, latency_total = facts.get(key, (0, 0, 0))
+                facts[key] = (attempts + 1, errors + (not correct), latency_total + latency_ms)
+            elif kind == "session":
+                sessions.append(row)
+            elif kind == "abandon":
+                abandoned.append(row)
+            else:
+                results.append(row)
+                self.session_players.pop(row[0], None)
+
+        new_ids = {}
+        with self.lock, self.connection:
+            for provisional_id, *row in sessions:
+                new_ids[provisional_id] = self.connection.execute(
+                    "INSERT INTO sessions (player, started_at, total_questions) VALUES (?, ?, ?)", row).lastrowid
+            # Rows of a session whose insert failed in an earlier batch have nowhere to go
+            session_ids = ChainMap(new_ids, self.session_ids)
+            self.connection.executemany("INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                        [(session_ids[row[0]],) + row[1:] for row in answers if row[0] in session_ids])
+            self.connection.executemany("INSERT INTO results VALUES (?, ?, ?, ?)",
+                                        [(session_ids[row[0]],) + row[1:] for row in results if row[0] in session_ids])
+            self.connection.executemany(UPSERT_FACT, [key + value for key, value in facts.items()])
+        self.session_ids.update(new_ids)
+        for row in results:
+            self.session_ids.pop(row[0], None)
+        for session_id in abandoned:
+            self.session_ids.pop(session_id, None)
+            self.session_players.pop(session_id, None)
+
+    def flush(self):
+        """Block until everything queued so far is on disk."""
+        self.pending.join()
+
+    def close(self):
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+        self.connection.close()
+
+
+class HistoryReader(HistoryQueries):
+    """Read-only view of a history file, cheap enough to open once per worker process."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.connection.close()
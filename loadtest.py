@@ -0,0 +1,285 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from array import array
+
+import numpy as np
+
+from quiz_engine import QuizEngine
+from server import DEFAULT_HOST, decode, encode
+
+
+THINK_FIXED = "fixed"
+THINK_EXPONENTIAL = "exponential"
+THINK_LOGNORMAL = "lognormal"
+THINK_SIGMA = 0.5  # spread of the lognormal think time
+MEMORY_SAMPLE = 1000  # sessions measured with tracemalloc for the in-process target
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+
+# ---------------- Virtual Students ----------------
+class StudentProfile:
+    """How one virtual student answers: its accuracy and a think-time sampler."""
+
+    __slots__ = ("accuracy", "think", "rng")
+
+    def __init__(self, accuracy, think, rng):
+        self.accuracy = accuracy
+        self.think = think
+        self.rng = rng
+
+    def answer_index(self, choices, correct):
+        """Pick a choice: the right one with probability `accuracy`, else a wrong one."""
+        correct_index = choices.index(correct)
+        if self.rng.random() < self.accuracy:
+            return correct_index
+        return (correct_index + 1 + self.rng.randrange(len(choices) - 1)) % len(choices)
+
+    async def pause(self):
+        seconds = self.think()
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+
+def think_sampler(kind, mean, rng):
+    if mean <= 0 or kind == THINK_FIXED:
+        return lambda: mean
+    if kind == THINK_EXPONENTIAL:
+        return lambda: rng.expovariate(1 / mean)
+    # Lognormal with the requested mean
+    mu = np.log(mean) - THINK_SIGMA ** 2 / 2
+    return lambda: rng.lognormvariate(mu, THINK_SIGMA)
+
+
+def make_profiles(count, accuracy, accuracy_spread, think, think_mean, seed):
+    rng = random.Random(seed)
+    profiles = []
+    for _ in range(count):
+        student_rng = random.Random(rng.random())
+        student_accuracy = min(1.0, max(0.0, rng.gauss(accuracy, accuracy_spread)))
+        profiles.append(StudentProfile(student_accuracy, think_sampler(think, think_mean, student_rng), student_rng))
+    return profiles
+
+
+# ---------------- Targets ----------------
+async def run_in_process(profiles, questions, latencies):
+    """Drive QuizEngine directly; a turn is scoring an answer plus producing the next question."""
+    async def student(profile):
+        engine = QuizEngine(questions, rng=profile.rng)
+        question = engine.new_question()
+        while question is not None:
+            await profile.pause()
+            started = time.perf_counter()
+            engine.check_answer(profile.answer_index(question.choices, question.correct))
+            engine.prefetch()
+            question = engine.new_question()
+            latencies.append(time.perf_counter() - started)
+        return engine.score
+
+    return await asyncio.gather(*(student(profile) for profile in profiles))
+
+
+async def run_remote(profiles, questions, latencies, host, port, all_finished=None):
+    """Drive a classroom server over TCP; a turn is the answer round trip plus the next question."""
+    finished = asyncio.Event()
+    remaining = [len(profiles)]
+
+    async def request(reader, writer, message):
+        writer.write(encode(message))
+        await writer.drain()
+        reply = decode(await reader.readline())
+        if reply["type"] == "error":
+            raise RuntimeError(reply["message"])
+        return reply
+
+    async def student(profile):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            await request(reader, writer, {"type": "start", "total_questions": questions})
+            reply = await request(reader, writer, {"type": "next"})
+            while reply["type"] == "question":
+                await profile.pause()
+                started = time.perf_counter()
+                index = profile.answer_index(reply["choices"], reply["a"] * reply["b"])
+                await request(reader, writer, {"type": "answer", "choice": index})
+                reply = await request(reader, writer, {"type": "next"})
+                latencies.append(time.perf_counter() - started)
+
+            # Hold the connection until everyone is done, so server memory is measured at its peak
+            remaining[0] -= 1
+            if not remaining[0]:
+                if all_finished:
+                    all_finished()
+                finished.set()
+            await finished.wait()
+            return reply["score"]
+        finally:
+            writer.close()
+
+    return await asyncio.gather(*(student(profile) for profile in profiles))
+
+
+def in_process_memory(questions, sessions):
+    """Bytes per finished in-process session, measured on a sample with tracemalloc."""
+    sample = min(sessions, MEMORY_SAMPLE)
+    if not sample:
+        return None
+    QuizEngine(questions)  # warm shared caches outside the measurement
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    engines = []
+    for _ in range(sample):
+        engine = QuizEngine(questions)
+        while engine.new_question() is not None:
+            engine.check_answer(0)
+        engines.append(engine)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used / sample
+
+
+def process_rss(pid):
+    """Resident memory of a process in bytes, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def spawn_server():
+    """Start server.py on a free localhost port; returns (process, port)."""
+    process = subprocess.Popen([sys.executable, SERVER_SCRIPT, "--host", DEFAULT_HOST, "--port", "0", "--no-history"],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    return process, int(line.rsplit(":", 1)[1])
+
+
+# ---------------- Report ----------------
+def run_load(students=100, questions=20, accuracy=0.8, accuracy_spread=0.1, think=THINK_LOGNORMAL,
+             think_mean=0.0, target="inprocess", seed=None):
+    """Run one load test and return its machine-readable report."""
+    profiles = make_profiles(students, accuracy, accuracy_spread, think, think_mean, seed)
+    latencies = array('d')
+    memory = None
+    process = None
+
+    started = time.perf_counter()
+    if target == "inprocess":
+        scores = asyncio.run(run_in_process(profiles, questions, latencies))
+        seconds = time.perf_counter() - started
+        memory = in_process_memory(questions, students)
+    else:
+        if target == "spawn":
+            process, port = spawn_server()
+            host = DEFAULT_HOST
+        else:
+            host, _, port = target.rpartition(":")
+            host, port = host or DEFAULT_HOST, int(port)
+        try:
+            rss_before = process_rss(process.pid) if process else None
+            peak = []
+            all_finished = (lambda: peak.append(process_rss(process.pid))) if process else None
+            started = time.perf_counter()
+            scores = asyncio.run(run_remote(profiles, questions, latencies, host, port, all_finished))
+            seconds = time.perf_counter() - started
+            if rss_before is not None and peak and peak[0] is not None:
+                memory = (peak[0] - rss_before) / students
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+    latency_ms = np.frombuffer(latencies, dtype=np.float64) * 1000 if len(latencies) else np.zeros(1)
+    return {
+        "config": {"students": students, "questions": questions, "accuracy": accuracy,
+                   "accuracy_spread": accuracy_spread, "think": think, "think_mean": think_mean,
+                   "target": target, "seed": seed},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "timestamp": time.time(),
+        "seconds": seconds,
+        "answers": len(latencies),
+        "throughput_answers_per_s": len(latencies) / seconds if seconds else None,
+        "latency_ms": {"p50": float(np.percentile(latency_ms, 50)), "p99": float(np.percentile(latency_ms, 99)),
+                       "mean": float(latency_ms.mean()), "max": float(latency_ms.max())},
+        "memory_per_session_bytes": memory,
+        "mean_score": sum(scores) / len(scores) if scores else 0,
+    }
+
+
+def config_differences(report, baseline):
+    """Settings, other than the seed, that differ between two reports; their numbers are not comparable."""
+    config, old = report["config"], baseline.get("config", {})
+    return [f"{key} {old.get(key)} -> {value}" for key, value in config.items()
+            if key != "seed" and old.get(key) != value]
+
+
+def compare(report, baseline):
+    """Lines describing how `report` moved against `baseline`."""
+    rows = [("throughput_answers_per_s", report["throughput_answers_per_s"], baseline["throughput_answers_per_s"]),
+            ("latency p50 ms", report["latency_ms"]["p50"], baseline["latency_ms"]["p50"]),
+            ("latency p99 ms", report["latency_ms"]["p99"], baseline["latency_ms"]["p99"]),
+            ("memory_per_session_bytes", report["memory_per_session_bytes"], baseline["memory_per_session_bytes"])]
+    lines = []
+    for name, new, old in rows:
+        if new is None or not old:
+            lines.append(f"  {name}: {new} (baseline {old})")
+        else:
+            lines.append(f"  {name}: {new:,.2f} vs {old:,.2f} ({(new - old) / old:+.1%})")
+    return lines
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("trebuie sa fie cel putin 1")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Elevi virtuali pentru testarea serverului de tabla inmultirii")
+    parser.add_argument("--students", type=positive_int, default=100)
+    parser.add_argument("--questions", type=positive_int, default=20, help="intrebari per elev")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="corectitudinea medie")
+    parser.add_argument("--accuracy-spread", type=float, default=0.1, help="abaterea standard intre elevi")
+    parser.add_argument("--think", choices=(THINK_FIXED, THINK_EXPONENTIAL, THINK_LOGNORMAL), default=THINK_LOGNORMAL)
+    parser.add_argument("--think-mean", type=float, default=0.0, help="secunde de gandire per intrebare")
+    parser.add_argument("--target", default="inprocess",
+                        help="inprocess (QuizEngine direct), spawn (server.py local) sau HOST:PORT")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", help="scrie raportul JSON aici")
+    parser.add_argument("--compare", metavar="BASELINE", help="compara cu un raport JSON anterior")
+    args = parser.parse_args()
+
+    report = run_load(args.students, args.questions, args.accuracy, args.accuracy_spread, args.think,
+                      args.think_mean, args.target, args.seed)
+    latency = report["latency_ms"]
+    memory = report["memory_per_session_bytes"]
+    print(f"{report['answers']} raspunsuri in {report['seconds']:.2f}s "
+          f"({report['throughput_answers_per_s']:,.0f} raspunsuri/s)")
+    print(f"  latenta p50 {latency['p50']:.3f} ms, p99 {latency['p99']:.3f} ms, max {latency['max']:.3f} ms")
+    print(f"  memorie per sesiune: {memory / 1024:.1f} KiB" if memory is not None else "  memorie per sesiune: n/a")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        differences = config_differences(report, baseline)
+        if differences:
+            sys.exit(f"Nu compar cu {args.compare}, configuratia difera: {', '.join(differences)}")
+        print(f"Fata de {args.compare}:")
+        print("\n".join(compare(report, baseline)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import os
+import struct
+import time
+
+from history import DEFAULT_PATH, FactStats
+from quiz_engine import MAX_ANSWER
+
+
+PROFILE_DIR = os.environ.get("TABLA_PROFILES", os.path.join(os.path.dirname(DEFAULT_PATH), "profiles"))
+DEFAULT_PROFILE = "Elev"
+SUFFIX = ".answers"
+LAST_PROFILE_FILE = "last"
+MAX_NAME = 32
+
+MAGIC = b"TBLA"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")  # magic, version, record size, padding to 16 bytes
+# a, b, the answer given, correct flag, latency in ms, unix time in seconds: 11 bytes per answer
+RECORD = struct.Struct("<BBHBHI")
+MAX_LATENCY_MS = 0xFFFF  # a minute is already far past "not known"
+
+_record_dtype = None
+
+
+def record_dtype():
+    """NumPy view of RECORD, built on first use so the menu never waits for NumPy."""
+    global _record_dtype
+    if _record_dtype is None:
+        import numpy as np
+        _record_dtype = np.dtype([("a", "u1"), ("b", "u1"), ("answer", "<u2"), ("correct", "u1"),
+                                  ("latency_ms", "<u2"), ("time", "<u4")])
+    return _record_dtype
+
+
+class AnswerArchive:
+    """One profile's lifetime answers as fixed-width binary records.
+
+    Answers are appended through a small write buffer as they happen. Reads
+    map the file into memory and view it as a NumPy record array, so the
+    statistics of years of answers are a few vectorized passes over the
+    mapped pages, with nothing parsed or copied into Python objects.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        if not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "wb") as archive:
+                archive.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        else:
+            with open(path, "rb") as archive:
+                magic, version, record_size = HEADER.unpack(archive.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError(f"{path} is not a version {VERSION} answer archive")
+
+    def __len__(self):
+        if self.file:
+            self.file.flush()
+        # A record cut short by a crash is ignored
+        return (os.path.getsize(self.path) - HEADER.size) // RECORD.size
+
+    # ---------------- Writing ----------------
+    def append(self, a, b, answer, correct, latency_ms, answered_at=None):
+        if self.file is None:
+            self.file = open(self.path, "ab")
+            # Drop a torn record, so every later record stays aligned
+            self.file.truncate(HEADER.size + len(self) * RECORD.size)
+        self.file.write(RECORD.pack(a, b, min(max(answer, 0), MAX_ANSWER), bool(correct),
+                                    min(max(int(latency_ms), 0), MAX_LATENCY_MS),
+                                    int(time.time() if answered_at is None else answered_at)))
+
+    def extend(self, rows):
+        """Append (a, b, answer, correct, latency_ms, answered_at) rows, e.g. imported from the history."""
+        for row in rows:
+            self.append(*row)
+        self.flush()
+
+    def flush(self):
+        if self.file:
+            self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    # ---------------- Reading ----------------
+    def records(self):
+        """Every answer, oldest first, as a read-only record array over the mapped file."""
+        import numpy as np
+        count = len(self)
+        if not count:
+            return np.zeros(0, dtype=record_dtype())
+        return np.memmap(self.path, dtype=record_dtype(), mode="r", offset=HEADER.size, shape=(count,))
+
+    def fact_stats(self):
+        """Lifetime FactStats per (a, b), like HistoryStore.fact_stats."""
+        import numpy as np
+        records = self.records()
+        if not len(records):
+            return {}
+        facts = records["a"].astype(np.intp) << 8 | records["b"]
+        attempts = np.bincount(facts)
+        errors = np.bincount(facts, weights=records["correct"] == 0)
+        latency = np.bincount(facts, weights=records["latency_ms"])
+        seen = np.flatnonzero(attempts)
+        rows = zip(seen.tolist(), attempts[seen].tolist(), errors[seen].tolist(), latency[seen].tolist())
+        return {(fact >> 8, fact & 0xFF): FactStats(count, int(wrong), int(latency_total))
+                for fact, count, wrong, latency_total in rows}
+
+    def mastery(self):
+        """MasteryStats over every answer in the archive."""
+        from analytics import MasteryStats
+        records = self.records()
+        stats = MasteryStats()
+        stats.update(records["a"], records["b"], records["correct"], records["latency_ms"])
+        return stats
+
+
+# ---------------- Profiles ----------------
+def profile_name(text):
+    """`text` as a profile name, or ValueError; names double as file names and history players."""
+    name = " ".join(text.split())
+    if not name or len(name) > MAX_NAME or not all(char.isalnum() or char in " -_" for char in name):
+        raise ValueError(f"name must be 1 to {MAX_NAME} letters, digits, spaces, - or _")
+    return name
+
+
+def profile_path(name, directory=PROFILE_DIR):
+    return os.path.join(directory, name + SUFFIX)
+
+
+def list_profiles(directory=PROFILE_DIR):
+    try:
+        files = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted((file[:-len(SUFFIX)] for file in files if file.endswith(SUFFIX)), key=str.casefold)
+
+
+def open_profile(name, directory=PROFILE_DIR, history=None):
+    """The AnswerArchive for `name`; a new profile starts with that player's answers from the history."""
+    path = profile_path(name, directory)
+    new = not os.path.exists(path)
+    archive = AnswerArchive(path)
+    if new and history:
+        history.flush()
+        # Sessions played before profiles existed were recorded without a name
+        players = (name, "") if name == DEFAULT_PROFILE else (name,)
+        try:
+            for player in players:
+                archive.extend(history.answer_records(player))
+        except OSError:
+            # A half-imported profile would never be imported again
+            archive.close()
+            os.remove(path)
+            raise
+    return archive
+
+
+def last_profile(directory=PROFILE_DIR):
+    try:
+        with open(os.path.join(directory, LAST_PROFILE_FILE), encoding="utf-8") as last:
+            return profile_name(last.read())
+    except (OSError, ValueError):
+        return None
+
+
+def set_last_profile(name, directory=PROFILE_DIR):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, LAST_PROFILE_FILE), "w", encoding="utf-8") as last:
+            last.write(name)
+    except OSError:
+        pass
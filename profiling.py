@@ -0,0 +1,172 @@
+import functools
+import json
+import os
+import platform
+import time
+from array import array
+
+
+RING_SIZE = 4096  # samples kept per probe; older ones are overwritten
+PROFILE_ENV = "TABLA_PROFILE"
+FORMAT_JSON = "json"
+FORMAT_CHROME = "chrome"
+
+
+class RingBuffer:
+    """The last `size` (start, duration) pairs of one probe, in seconds, in two preallocated arrays."""
+
+    __slots__ = ("starts", "durations", "index", "count", "total")
+
+    def __init__(self, size=RING_SIZE):
+        self.starts = array('d', bytes(8 * size))
+        self.durations = array('d', bytes(8 * size))
+        self.index = 0
+        self.count = 0  # every sample ever recorded, including overwritten ones
+        self.total = 0.0
+
+    def add(self, start, duration):
+        index = self.index
+        self.starts[index] = start
+        self.durations[index] = duration
+        self.index = (index + 1) % len(self.starts)
+        self.count += 1
+        self.total += duration
+
+    def __len__(self):
+        return min(self.count, len(self.starts))
+
+    def samples(self):
+        """(start, duration) pairs still held, oldest first."""
+        size = len(self.starts)
+        first = self.index if self.count > size else 0
+        for offset in range(len(self)):
+            position = (first + offset) % size
+            yield self.starts[position], self.durations[position]
+
+    def stats(self):
+        held = sorted(self.durations[:len(self)])
+        if not held:
+            return {"count": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {"count": self.count,
+                "mean_ms": self.total / self.count * 1000,
+                "p95_ms": held[min(len(held) - 1, int(len(held) * 0.95))] * 1000,
+                "max_ms": held[-1] * 1000}
+
+
+class Profiler:
+    """Named ring buffers of call timings, exportable as JSON or Chrome trace events.
+
+    Nothing here runs unless instrument() has wrapped a method, so a build
+    with profiling off pays no per-call cost at all.
+    """
+
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.origin = time.perf_counter()
+        self.probes = {}
+
+    def probe(self, name):
+        ring = self.probes.get(name)
+        if ring is None:
+            ring = self.probes[name] = RingBuffer(self.size)
+        return ring
+
+    def record(self, name, start, duration):
+        """Add a sample; `start` is a time.perf_counter() value."""
+        self.probe(name).add(start - self.origin, duration)
+
+    def instrument(self, owner, attribute, name=None):
+        """Replace owner.attribute (a method or function) with a copy that times every call."""
+        function = owner.__dict__[attribute]
+        ring = self.probe(name or f"{owner.__name__}.{attribute}")
+        origin = self.origin
+        clock = time.perf_counter
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end = clock()
+                ring.add(start - origin, end - start)
+
+        setattr(owner, attribute, timed)
+        return timed
+
+    def rate(self, name, window=1.0):
+        """Samples per second over the last `window` seconds, e.g. frames per second."""
+        ring = self.probes.get(name)
+        if ring is None:
+            return 0.0
+        since = time.perf_counter() - self.origin - window
+        return sum(1 for start, _ in ring.samples() if start >= since) / window
+
+    def worst(self, limit=5):
+        """(name, stats) for the probes with the slowest p95, slowest first."""
+        stats = [(name, ring.stats()) for name, ring in self.probes.items() if len(ring)]
+        stats.sort(key=lambda item: item[1]["p95_ms"], reverse=True)
+        return stats[:limit]
+
+    # ---------------- Export ----------------
+    def report(self):
+        return {
+            "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            "timestamp": time.time(),
+            "seconds": time.perf_counter() - self.origin,
+            "probes": {name: dict(ring.stats(), samples=[[round(start * 1000, 3), round(duration * 1000, 3)]
+                                                         for start, duration in ring.samples()])
+                       for name, ring in self.probes.items()},
+        }
+
+    def trace(self):
+        """Chrome trace event format, for chrome://tracing or Perfetto."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "tabla"}}]
+        for tid, (name, ring) in enumerate(self.probes.items(), 1):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+            for start, duration in ring.samples():
+                events.append({"name": name, "ph": "X", "pid": pid, "tid": tid,
+                               "ts": round(start * 1e6, 1), "dur": round(duration * 1e6, 1)})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path, format=FORMAT_JSON):
+        with open(path, "w") as output:
+            json.dump(self.trace() if format == FORMAT_CHROME else self.report(), output)
+
+
+class StartupTimer:
+    """Wall-clock phases of a launch, each measured from the end of the previous one."""
+
+    def __init__(self, started=None):
+        self.started = self.last = time.perf_counter() if started is None else started
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def lines(self):
+        lines = [f"  {phase}: {seconds * 1000:.1f} ms" for phase, seconds in self.phases]
+        lines.append(f"  total: {(self.last - self.started) * 1000:.1f} ms")
+        return lines
+
+
+_profiler = None
+
+
+def enabled():
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+def profiler():
+    """The running Profiler, or None when profiling is off."""
+    return _profiler
+
+
+def start(size=RING_SIZE):
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(size)
+    return _profiler
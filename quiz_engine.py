@@ -0,0 +1,471 @@
+import json
+import random
+import time
+from array import array
+from collections import Counter, namedtuple
+from itertools import compress, islice
+from operator import not_
+
+from deck import fact_deck, table_facts
+from distractors import distractor_index
+from scheduler import MODE_UNIFORM
+
+
+CORRECT_MESSAGES = ["Excelent 🦄", "Foarte Bine 🎉", "Ai dreptate 😘", "Te descurci excelent 👏", "Avem un mic geniu printre noi 🧠", "Corect 👏", "O sa ajungi departe 🚀"]
+WRONG_MESSAGES = ["Aproape bine 🙈", "Nu e bai, mai incearca 🤩", "Se poate intampla oricui 🐵", "Hai ca poti 👸", "Nici eu nu o stiam pe asta 🙊", "Repetitia e mama invataturii 🤩", "Haide, nu te lasa 💪"]
+
+NUM_CHOICES = 4
+TABLE_SIZE = 10
+FEEDBACK_DELAY_MS = 1000
+INPUT_CHOICES = "choices"  # answer by picking one of the hearts (mouse or keys 1-4)
+INPUT_TYPED = "typed"  # answer by typing the number
+MAX_ANSWER = 0xFFFF  # largest typed answer taken; profile archives store answers in 16 bits
+KEEP = object()  # reset() argument default: keep the current session length
+SEED_BITS = 32
+
+# EventLog event kinds
+EVENT_QUESTION = 0  # t, a, b, choices...
+EVENT_ANSWER = 1  # t, user_answer
+EVENT_STOP = 2  # t
+EVENT_FIELDS = {EVENT_QUESTION: 3 + NUM_CHOICES, EVENT_ANSWER: 2, EVENT_STOP: 1}
+EVENT_NAMES = {EVENT_QUESTION: "q", EVENT_ANSWER: "a", EVENT_STOP: "s"}
+
+Question = namedtuple("Question", "number a b correct choices")
+Summary = namedtuple("Summary", "score total percentage congrats_text elapsed_time mistakes answers")
+# total_questions None means an endless drill, stopped with QuizEngine.stop()
+SessionSettings = namedtuple("SessionSettings", "total_questions tables max_operand mode feedback_delay answer_input",
+                             defaults=(10, tuple(range(1, TABLE_SIZE + 1)), TABLE_SIZE, MODE_UNIFORM,
+                                       FEEDBACK_DELAY_MS, INPUT_CHOICES))
+SimulationResult = namedtuple("SimulationResult", "sessions questions score_histogram fact_attempts fact_errors seconds")
+
+
+def format_time(seconds):
+    """Format seconds into MM:SS string"""
+    mins = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{mins:02d}:{secs:02d}"
+
+
+def congrats_text(percentage_score):
+    if percentage_score == 100:
+        return "Esti un geniu! Felicitari! 🌟🌟🌟"
+    elif percentage_score >= 75:
+        return "Excelent! Ai invatat bine! 🎉"
+    elif percentage_score >= 50:
+        return "Bine! Mai exerseaza putin! 👍"
+    elif percentage_score >= 25:
+        return "Nu e rau! Mai incearca! 🤗"
+    return "Nu te descuraja! Mai incearca! 💪"
+
+
+class AnswerLog:
+    """Every answered question of a session, one entry per column array.
+
+    Latencies are milliseconds from the question being shown to the click,
+    measured with the monotonic perf_counter clock.
+    """
+
+    MAX_LATENCY_MS = 0xFFFFFFFF
+
+    def __init__(self):
+        self.a = array('H')
+        self.b = array('H')
+        self.user_answer = array('I')
+        self.correct = array('B')
+        self.latency_ms = array('I')
+
+    def __len__(self):
+        return len(self.latency_ms)
+
+    def append(self, a, b, user_answer, correct, latency_ms):
+        self.a.append(a)
+        self.b.append(b)
+        self.user_answer.append(user_answer)
+        self.correct.append(correct)
+        self.latency_ms.append(min(latency_ms, self.MAX_LATENCY_MS))
+
+    def fact_latencies(self):
+        """Mean latency in milliseconds for each fact answered this session."""
+        totals = {}
+        for fact, latency in zip(zip(self.a, self.b), self.latency_ms):
+            total, count = totals.get(fact, (0, 0))
+            totals[fact] = (total + latency, count + 1)
+        return {fact: total / count for fact, (total, count) in totals.items()}
+
+
+class EventLog:
+    """Replayable record of one session: its seed, every question shown and
+    every answer given, with milliseconds since the session was reset.
+
+    Events are packed into one flat integer array (kind followed by its
+    fields), so a log costs a few dozen bytes per question even on a server
+    holding thousands of sessions. Saved logs are JSON lines: a header with the
+    seed and settings, then one short array per event.
+    """
+
+    VERSION = 1
+
+    def __init__(self, seed, settings=None, scheduler_seed=None):
+        self.seed = seed
+        self.settings = settings  # dict of SessionSettings fields, set by whoever started the session
+        self.scheduler_seed = scheduler_seed  # the adaptive scheduler's initial shuffle, if one picked the facts
+        self.created_at = time.time()
+        self.started = time.perf_counter()
+        self.data = array('q')
+
+    def elapsed_ms(self):
+        return round((time.perf_counter() - self.started) * 1000)
+
+    def question(self, question):
+        self.data.append(EVENT_QUESTION)
+        self.data.append(self.elapsed_ms())
+        self.data.append(question.a)
+        self.data.append(question.b)
+        self.data.extend(question.choices)
+
+    def answer(self, user_answer):
+        self.data.extend((EVENT_ANSWER, self.elapsed_ms(), user_answer))
+
+    def stop(self):
+        self.data.extend((EVENT_STOP, self.elapsed_ms()))
+
+    def events(self):
+        """Yield (kind, t_ms, *fields) tuples in order."""
+        data = self.data
+        i = 0
+        while i < len(data):
+            kind = data[i]
+            end = i + 1 + EVENT_FIELDS[kind]
+            yield tuple(data[i:end])
+            i = end
+
+    def save(self, path):
+        with open(path, "w") as log_file:
+            header = {"v": self.VERSION, "seed": self.seed, "created_at": self.created_at, "settings": self.settings}
+            if self.scheduler_seed is not None:
+                header["scheduler_seed"] = self.scheduler_seed
+            log_file.write(json.dumps(header) + "\n")
+            for kind, *fields in self.events():
+                log_file.write(json.dumps([EVENT_NAMES[kind], *fields]) + "\n")
+
+    @classmethod
+    def load(cls, path):
+        kinds = {name: kind for kind, name in EVENT_NAMES.items()}
+        with open(path) as log_file:
+            header = json.loads(log_file.readline())
+            if header.get("v") != cls.VERSION:
+                raise ValueError(f"unsupported event log version: {header.get('v')}")
+            log = cls(header["seed"], header.get("settings"), header.get("scheduler_seed"))
+            log.created_at = header.get("created_at", 0)
+            for line in log_file:
+                name, *fields = json.loads(line)
+                kind = kinds[name]
+                if len(fields) != EVENT_FIELDS[kind]:
+                    raise ValueError(f"bad {name} event: {line.strip()}")
+                log.data.append(kind)
+                log.data.extend(fields)
+        return log
+
+
+class Mistake:
+    """Wrong answers given for one fact during a session."""
+
+    __slots__ = ("a", "b", "correct", "count", "user_answers", "total_time")
+
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+        self.correct = a * b
+        self.count = 0
+        self.user_answers = []
+        self.total_time = 0.0
+
+    @property
+    def question(self):
+        return f"{self.a} × {self.b}"
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.count if self.count else 0.0
+
+    def add(self, user_answer, response_time):
+        self.count += 1
+        self.total_time += response_time
+        if user_answer not in self.user_answers:
+            self.user_answers.append(user_answer)
+
+
+class QuizEngine:
+    """Qt-free quiz session: question generation, answer checking and scoring."""
+
+    def __init__(self, total_questions, rng=None, scheduler=None, facts=None):
+        self.session_length = total_questions
+        self.seed_source = rng if rng is not None else random  # each session's seed is drawn from here
+        self.seed = None
+        self.rng = random.Random()
+        self.scheduler = scheduler  # None deals facts from a shuffled deck
+        self.question = None
+        self.upcoming = None
+        self.answered = False
+        self.set_facts(facts or table_facts(range(1, TABLE_SIZE + 1), TABLE_SIZE))
+        self.reset()
+
+    def set_facts(self, facts):
+        """Choose which facts are asked; the deck starts a fresh shuffle."""
+        self.facts = tuple(facts)
+        self.distractors = distractor_index(self.facts)  # shared by every engine on these facts
+        self.upcoming = None
+        self.deck = fact_deck(self.facts, self.rng)
+
+    def reset(self, total_questions=KEEP, seed=None):
+        """Start a new session; the same seed and answers always give the same questions."""
+        if total_questions is not KEEP:
+            self.session_length = total_questions
+        self.total_questions = self.session_length
+        self.release_question()
+
+        self.seed = seed if seed is not None else self.draw_seed()
+        self.rng.seed(self.seed)
+        self.deck = fact_deck(self.facts, self.rng)
+        self.log = EventLog(self.seed, scheduler_seed=self.scheduler.seed if self.scheduler else None)
+        self.score = 0
+        self.current_question = 0
+        self.mistakes = {}  # Wrong answers grouped by fact
+        self.answers = AnswerLog()
+        self.question = None
+        self.question_shown_at = None
+        self.start_time = None
+        self.elapsed_time = 0
+
+    @property
+    def is_finished(self):
+        return self.total_questions is not None and self.current_question >= self.total_questions
+
+    def stop(self):
+        """End an endless (or any) drill after the questions answered so far.
+
+        A question shown but not answered is dropped, and no answer is taken
+        after this; calling it again changes nothing.
+        """
+        if self.question is None and self.is_finished:
+            return  # already stopped, or ran out of questions
+        if self.question and not self.answered:
+            self.current_question -= 1
+        self.total_questions = self.current_question
+        self.release_question()
+        self.question = None
+        self.log.stop()
+
+    # ---------------- Game Logic ----------------
+    def release_question(self):
+        # A scheduled fact that was shown but never answered goes back in the queue
+        if self.scheduler and self.question and not self.answered:
+            self.scheduler.release((self.question.a, self.question.b))
+        self.answered = False
+        self.release_upcoming()
+
+    def release_upcoming(self):
+        if self.scheduler and self.upcoming:
+            self.scheduler.release((self.upcoming.a, self.upcoming.b))
+        self.upcoming = None
+
+    def draw_seed(self):
+        """A fresh seed from the seed source, for a session or a scheduler; whoever uses it records it."""
+        return self.seed_source.getrandbits(SEED_BITS)
+
+    def set_scheduler(self, scheduler):
+        self.reset()  # hands a pending fact back to the old scheduler
+        self.scheduler = scheduler
+        self.log.scheduler_seed = scheduler.seed if scheduler else None
+
+    def next_fact(self):
+        if self.scheduler:
+            return self.scheduler.next_fact()
+        return next(self.deck)
+
+    def deal_facts(self, sessions, length):
+        """The facts of `sessions` sessions of `length` questions, back to back, for bulk simulation.
+
+        Each session is dealt from its own fresh no-repeat deck, exactly as
+        reset() deals them, with no Question or distractors built.
+        """
+        facts = []
+        for _ in range(sessions):
+            facts.extend(islice(fact_deck(self.facts, self.rng), length))
+        return facts
+
+    def build_question(self, number):
+        a, b = self.next_fact()
+        correct = a * b
+
+        answers = self.distractors.pick(a, b, NUM_CHOICES - 1, self.rng)
+        answers.append(correct)
+        self.rng.shuffle(answers)
+        return Question(number, a, b, correct, answers)
+
+    def prefetch(self):
+        """Build the next question ahead of time, once the current one is answered.
+
+        new_question() then only has to stamp it, so the question can be shown
+        as soon as the feedback delay is over.
+        """
+        if self.upcoming is None and self.answered and not self.is_finished:
+            self.upcoming = self.build_question(self.current_question + 1)
+        return self.upcoming
+
+    def new_question(self):
+        """Advance to the next question, or return None when the quiz is over."""
+        upcoming, self.upcoming = self.upcoming, None
+        self.release_question()
+        if self.is_finished:
+            self.question = None
+            return None
+
+        return self.present(upcoming or self.build_question(self.current_question + 1))
+
+    def present(self, question):
+        """Make `question` the current one and start its clock.
+
+        Also used by clients whose questions come from a classroom server, so
+        the local engine scores and times them with the same rules.
+        """
+        self.current_question = question.number
+        self.question = question
+        self.answered = False
+        self.log.question(question)
+
+        now = time.perf_counter()
+        if question.number == 1:
+            self.start_time = now
+        self.question_shown_at = now
+        return question
+
+    def check_answer(self, index):
+        """Score the choice at `index` for the current question; returns True if correct."""
+        return self.submit_answer(self.question.choices[index])
+
+    def submit_answer(self, user_answer, latency_ms=None):
+        """Score `user_answer` (a choice or a typed number) for the current question.
+
+        `latency_ms` overrides the measured response time, for replays.
+        Raises ValueError when no question is waiting for an answer, so each
+        question is scored once whatever the caller does.
+        """
+        question = self.question
+        if question is None or self.answered:
+            raise ValueError("no question waiting for an answer")
+        if latency_ms is None:
+            response_time = time.perf_counter() - self.question_shown_at
+            latency_ms = round(response_time * 1000)
+        else:
+            response_time = latency_ms / 1000
+        self.log.answer(user_answer)
+        correct = user_answer == question.correct
+        self.answers.append(question.a, question.b, user_answer, correct, latency_ms)
+        if self.scheduler:
+            self.scheduler.record((question.a, question.b), correct, latency_ms)
+        self.answered = True
+        if correct:
+            self.score += 1
+            return True
+
+        fact = (question.a, question.b)
+        mistake = self.mistakes.get(fact)
+        if mistake is None:
+            mistake = self.mistakes[fact] = Mistake(question.a, question.b)
+        mistake.add(user_answer, response_time)
+        return False
+
+    def feedback_message(self, correct):
+        # Derived from the seed rather than drawn from self.rng, so showing a
+        # message never shifts the question stream
+        messages = CORRECT_MESSAGES if correct else WRONG_MESSAGES
+        return messages[hash((self.seed, self.current_question)) % len(messages)]
+
+    def update_elapsed(self):
+        if self.start_time is not None:
+            self.elapsed_time = time.perf_counter() - self.start_time
+        return self.elapsed_time
+
+    # ---------------- Summary ----------------
+    def summary(self):
+        percentage_score = (self.score / self.total_questions) * 100 if self.total_questions else 0
+        return Summary(self.score, self.total_questions, percentage_score,
+                       congrats_text(percentage_score), self.elapsed_time,
+                       list(self.mistakes.values()), self.answers)
+
+
+# ---------------- Batch Simulator ----------------
+SIMULATION_CHUNK = 10000
+
+
+def simulate_sessions(sessions, total_questions=10, accuracy=0.8, seed=None, full=False):
+    """Run synthetic sessions of the uniform (deck) mode without any widgets.
+
+    A simulated child answers correctly with probability `accuracy`. By default
+    each chunk of sessions is dealt from the engine's no-repeat deck in one go
+    and the outcomes are coin flips, so the question mix matches real sessions
+    while skipping distractors and scoring; that runs around 100k sessions
+    per second. `full=True` drives every question through
+    new_question()/check_answer() instead, at a few thousand sessions per second.
+    """
+    rng = random.Random(seed)
+    engine = QuizEngine(total_questions, rng=rng)
+    score_histogram = Counter()
+    fact_attempts = Counter()
+    fact_errors = Counter()
+
+    started = time.perf_counter()
+    if full:
+        _simulate_full(engine, rng, sessions, accuracy, score_histogram, fact_attempts, fact_errors)
+    else:
+        chance = rng.random
+        for first in range(0, sessions, SIMULATION_CHUNK):
+            chunk = min(SIMULATION_CHUNK, sessions - first)
+            count = chunk * total_questions
+            facts = engine.deal_facts(chunk, total_questions)
+            hits = [chance() < accuracy for _ in range(count)]
+            fact_attempts.update(facts)
+            fact_errors.update(compress(facts, map(not_, hits)))
+            if total_questions:
+                score_histogram.update(map(sum, (hits[i:i + total_questions] for i in range(0, count, total_questions))))
+    seconds = time.perf_counter() - started
+
+    return SimulationResult(sessions, sessions * total_questions, score_histogram,
+                            fact_attempts, fact_errors, seconds)
+
+
+def _simulate_full(engine, rng, sessions, accuracy, score_histogram, fact_attempts, fact_errors):
+    # Local aliases keep the inner loop tight
+    new_question = engine.new_question
+    check_answer = engine.check_answer
+    chance = rng.random
+    pick = rng.randrange
+
+    for _ in range(sessions):
+        engine.reset()
+        while True:
+            question = new_question()
+            if question is None:
+                break
+            fact = (question.a, question.b)
+            fact_attempts[fact] += 1
+            correct_index = question.choices.index(question.correct)
+            if chance() < accuracy:
+                index = correct_index
+            else:
+                index = (correct_index + 1 + pick(NUM_CHOICES - 1)) % NUM_CHOICES
+            if not check_answer(index):
+                fact_errors[fact] += 1
+        score_histogram[engine.score] += 1
+
+
+if __name__ == "__main__":
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    result = simulate_sessions(count)
+    rate = result.sessions / result.seconds if result.seconds else float("inf")
+    print(f"{result.sessions} sesiuni, {result.questions} intrebari in {result.seconds:.2f}s ({rate:,.0f} sesiuni/s)")
+    for score in sorted(result.score_histogram):
+        print(f"  scor {score:3d}: {result.score_histogram[score]}")
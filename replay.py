@@ -0,0 +1,104 @@
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+
+from deck import table_facts
+from history import DEFAULT_PATH
+from quiz_engine import (EVENT_ANSWER, EVENT_QUESTION, EVENT_STOP, EventLog, Question, QuizEngine,
+                         SessionSettings)
+from scheduler import MODE_UNIFORM
+
+
+LOG_DIR = os.environ.get("TABLA_LOGS", os.path.join(os.path.dirname(DEFAULT_PATH), "sessions"))
+
+ReplayResult = namedtuple("ReplayResult", "summary questions mismatches")
+
+
+def log_path(log, directory=LOG_DIR):
+    """Where a session's event log is saved: start time plus seed, so names sort and stay unique."""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(log.created_at))
+    return os.path.join(directory, f"{stamp}-{log.seed:08x}.jsonl")
+
+
+def save_log(log, directory=LOG_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = log_path(log, directory)
+    log.save(path)
+    return path
+
+
+def log_settings(log):
+    return SessionSettings(**log.settings) if log.settings else SessionSettings()
+
+
+def replay(log):
+    """Run a recorded session through the quiz rules with no widgets and no waiting.
+
+    Uniform sessions are regenerated from the seed, and every question is
+    checked against the recorded one; a mismatch means the question rules
+    changed since the log was written. Adaptive sessions depend on the
+    player's whole history, so their recorded questions are replayed as is.
+    Answers are re-scored with their recorded latencies.
+    """
+    settings = log_settings(log)
+    engine = QuizEngine(settings.total_questions, facts=table_facts(settings.tables, settings.max_operand))
+    engine.reset(seed=log.seed)
+    regenerate = settings.mode == MODE_UNIFORM
+
+    questions = mismatches = 0
+    shown_at = first_shown = last_event = 0
+    for kind, t, *fields in log.events():
+        last_event = t
+        if kind == EVENT_QUESTION:
+            questions += 1
+            a, b, *choices = fields
+            recorded = Question(questions, a, b, a * b, choices)
+            if regenerate:
+                question = engine.new_question()
+                if question is None or (question.a, question.b, question.choices) != (a, b, choices):
+                    mismatches += 1
+                    engine.present(recorded)
+            else:
+                engine.present(recorded)
+            shown_at = t
+            if questions == 1:
+                first_shown = t
+        elif kind == EVENT_ANSWER:
+            engine.submit_answer(fields[0], latency_ms=t - shown_at)
+        elif kind == EVENT_STOP:
+            engine.stop()
+
+    if not engine.is_finished:
+        engine.stop()  # the log ends mid-session
+    engine.elapsed_time = (last_event - first_shown) / 1000
+    return ReplayResult(engine.summary(), questions, mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reia sesiuni inregistrate, fara ferestre")
+    parser.add_argument("logs", nargs="+", help="fisiere .jsonl din " + LOG_DIR)
+    parser.add_argument("--check", action="store_true", help="iesire cu eroare daca intrebarile nu se potrivesc")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    failed = 0
+    for path in args.logs:
+        try:
+            result = replay(EventLog.load(path))
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            print(f"{path}: nu pot citi jurnalul ({error})")
+            failed += 1
+            continue
+        summary = result.summary
+        status = "ok" if not result.mismatches else f"{result.mismatches} intrebari diferite"
+        print(f"{path}: scor {summary.score}/{summary.total}, {result.questions} intrebari, {status}")
+        failed += bool(result.mismatches)
+    print(f"{len(args.logs)} sesiuni reluate in {time.perf_counter() - started:.3f}s")
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
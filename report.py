@@ -0,0 +1,259 @@
+import argparse
+import html
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from history import DEFAULT_PATH, FactStats, HistoryReader
+from quiz_engine import Mistake, format_time
+
+
+REPORT_DIR = "rapoarte"
+CLASS_FILE = "clasa"
+FORMAT_HTML = "html"
+FORMAT_PDF = "pdf"
+REPEATED = 2  # a fact answered wrong at least this often is a repeated mistake
+WEAK_PERCENT = 80  # facts answered right less often than this are highlighted
+HARDEST_FACTS = 10
+PDF_DPI = 96  # the screen resolution the HTML sizes assume
+UNNAMED = "fara nume"  # sessions played before profiles were recorded without a name
+
+StudentReport = namedtuple("StudentReport", "player file sessions questions score elapsed repeated facts")
+
+# Borders and padding are table attributes: Qt lays out CSS collapsed borders
+# several times slower, and that layout is most of a PDF's cost
+TABLE = '<table border="1" cellspacing="0" cellpadding="4">'
+STYLE = """
+body { font-family: Helvetica, Arial, sans-serif; color: #5A375A; }
+h1 { color: #C2185B; }
+table { margin-bottom: 16px; }
+th { background-color: #F8BBD0; text-align: left; }
+td.number { text-align: right; }
+tr.weak td { color: #C2185B; font-weight: bold; }
+"""
+
+
+# ---------------- Rendering ----------------
+def percent(part, whole):
+    return part / whole * 100 if whole else 0.0
+
+
+def date_text(timestamp):
+    return time.strftime("%d.%m.%Y %H:%M", time.localtime(timestamp))
+
+
+def table(headers, rows, weak=()):
+    """An HTML table; cells are escaped, and rows whose index is in `weak` are highlighted."""
+    lines = [TABLE, "<tr>" + "".join(f"<th>{html.escape(header)}</th>" for header in headers) + "</tr>"]
+    for index, row in enumerate(rows):
+        cells = "".join(f'<td class="number">{cell}</td>' if isinstance(cell, (int, float))
+                        else f"<td>{html.escape(str(cell))}</td>" for cell in row)
+        lines.append(f'<tr class="weak">{cells}</tr>' if index in weak else f"<tr>{cells}</tr>")
+    lines.append("</table>")
+    return "\n".join(lines)
+
+
+def page(title, body):
+    return (f'<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f"<style>{STYLE}</style></head><body>\n{body}\n</body></html>\n")
+
+
+def student_report(reader, player, file, since=0.0):
+    """A StudentReport for `player` and its HTML page, from the finished sessions and their answers."""
+    sessions = reader.sessions(player, since)
+    facts = {}
+    mistakes = {}
+    for a, b, user_answer, correct, latency_ms, _ in reader.answer_records(player, since, finished=True):
+        stats = facts.get((a, b))
+        if stats is None:
+            stats = facts[(a, b)] = FactStats()
+        stats.add(correct, latency_ms)
+        if not correct:
+            mistake = mistakes.get((a, b))
+            if mistake is None:
+                mistake = mistakes[(a, b)] = Mistake(a, b)
+            mistake.add(user_answer, latency_ms / 1000)
+    repeated = sorted((mistake for mistake in mistakes.values() if mistake.count >= REPEATED),
+                      key=lambda mistake: (-mistake.count, mistake.a, mistake.b))
+
+    # Endless drills store 0 as their length, so a session's size is its answer count
+    questions = sum(answered for _, _, _, answered, _, _ in sessions)
+    score = sum(score for *_, score, _ in sessions)
+    elapsed = sum(elapsed for *_, elapsed in sessions)
+    report = StudentReport(player, file, len(sessions), questions, score, elapsed, len(repeated), facts)
+
+    name = player or UNNAMED
+    parts = [f"<h1>{html.escape(name)}</h1>"]
+    if sessions:
+        parts.append(f"<p>{date_text(sessions[0][1])} - {date_text(sessions[-1][1])}: {len(sessions)} sesiuni, "
+                     f"scor {score} din {questions} ({percent(score, questions):.2f}%), "
+                     f"timp total {format_time(elapsed)}</p>")
+    parts.append("<h2>Sesiuni</h2>")
+    parts.append(table(["Data", "Scor", "Procent", "Timp"],
+                       [(date_text(started_at), f"{score}/{answered}", f"{percent(score, answered):.0f}%",
+                         format_time(elapsed))
+                        for _, started_at, _, answered, score, elapsed in sessions]))
+    parts.append("<h2>Greseli repetate</h2>")
+    if repeated:
+        parts.append(table(["Intrebare", "Ai raspuns", "Greseli", "Timp mediu"],
+                           [(f"{mistake.question} = {mistake.correct}",
+                             ", ".join(str(answer) for answer in mistake.user_answers),
+                             f"{mistake.count}×", f"{mistake.mean_time:.1f}s") for mistake in repeated]))
+    else:
+        parts.append("<p>Nicio greseala repetata.</p>")
+    parts.append("<h2>Pe fiecare intrebare</h2>")
+    rows, weak = [], set()
+    for index, ((a, b), stats) in enumerate(sorted(facts.items())):
+        right = percent(stats.attempts - stats.errors, stats.attempts)
+        if right < WEAK_PERCENT:
+            weak.add(index)
+        rows.append((f"{a} × {b} = {a * b}", stats.attempts, stats.errors, f"{right:.0f}%",
+                     f"{stats.mean_latency_ms / 1000:.1f}s"))
+    parts.append(table(["Intrebare", "Incercari", "Greseli", "Corect", "Timp mediu"], rows, weak))
+    return report, page(f"Raport - {name}", "\n".join(parts))
+
+
+def class_page(reports, format=FORMAT_HTML):
+    """The class summary: one row per student, linked to their report, and the facts the class missed most."""
+    rows = []
+    for report in reports:
+        link = f'<a href="{html.escape(report.file)}.{format}">{html.escape(report.player or UNNAMED)}</a>'
+        rows.append(f"<tr><td>{link}</td><td class=\"number\">{report.sessions}</td>"
+                    f"<td class=\"number\">{report.questions}</td>"
+                    f"<td class=\"number\">{percent(report.score, report.questions):.0f}%</td>"
+                    f"<td>{format_time(report.elapsed)}</td><td class=\"number\">{report.repeated}</td></tr>")
+    headers = "".join(f"<th>{header}</th>" for header in
+                      ("Elev", "Sesiuni", "Intrebari", "Scor", "Timp total", "Greseli repetate"))
+    parts = [f"<h1>Clasa: {len(reports)} elevi</h1>", TABLE, f"<tr>{headers}</tr>", *rows, "</table>"]
+
+    facts = {}
+    for report in reports:
+        for fact, stats in report.facts.items():
+            total = facts.get(fact)
+            if total is None:
+                total = facts[fact] = FactStats()
+            total.attempts += stats.attempts
+            total.errors += stats.errors
+            total.latency_total_ms += stats.latency_total_ms
+    hardest = sorted((item for item in facts.items() if item[1].errors),
+                     key=lambda item: item[1].errors / item[1].attempts, reverse=True)[:HARDEST_FACTS]
+    parts.append("<h2>Cele mai grele intrebari</h2>")
+    parts.append(table(["Intrebare", "Incercari", "Greseli", "Corect", "Timp mediu"],
+                       [(f"{a} × {b} = {a * b}", stats.attempts, stats.errors,
+                         f"{percent(stats.attempts - stats.errors, stats.attempts):.0f}%",
+                         f"{stats.mean_latency_ms / 1000:.1f}s") for (a, b), stats in hardest]))
+    return page("Raport clasa", "\n".join(parts))
+
+
+def write_document(text, path, format=FORMAT_HTML):
+    if format == FORMAT_PDF:
+        from PyQt6.QtCore import QSizeF
+        from PyQt6.QtGui import QPageSize, QPdfWriter, QTextDocument
+        writer = QPdfWriter(path)
+        writer.setPageSize(QPageSize(QPageSize.PageSizeId.A4))
+        writer.setResolution(PDF_DPI)
+        document = QTextDocument()
+        document.setHtml(text)
+        # Paged at the writer's own size, print() lays the document out once instead of on a copy
+        document.setPageSize(QSizeF(writer.pageLayout().paintRectPixels(PDF_DPI).size()))
+        document.print(writer)
+    else:
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(text)
+
+
+# ---------------- Worker Processes ----------------
+_reader = None
+_qt = None
+
+
+def init_worker(history_path, format):
+    """Open one read-only history connection per process, plus a GUI-less Qt application for PDF."""
+    global _reader, _qt
+    _reader = HistoryReader(history_path)
+    if format == FORMAT_PDF:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6.QtGui import QGuiApplication
+        _qt = QGuiApplication([])
+
+
+def export_student(player, file, directory, format, since):
+    report, text = student_report(_reader, player, file, since)
+    write_document(text, os.path.join(directory, f"{file}.{format}"), format)
+    return report
+
+
+def export_class(reports, directory, format):
+    path = os.path.join(directory, f"{CLASS_FILE}.{format}")
+    write_document(class_page(reports, format), path, format)
+    return path
+
+
+# ---------------- Export ----------------
+def file_names(players):
+    """A distinct, file-system safe base name per player."""
+    names, used = {}, {CLASS_FILE}
+    for player in players:
+        base = "".join(char if char.isalnum() or char in "-_" else "_" for char in player or UNNAMED)
+        name, suffix = base, 1
+        while name.casefold() in used:
+            suffix += 1
+            name = f"{base}_{suffix}"
+        used.add(name.casefold())
+        names[player] = name
+    return names
+
+
+def export_reports(history_path=DEFAULT_PATH, directory=REPORT_DIR, players=None, format=FORMAT_HTML,
+                   workers=None, since=0.0):
+    """Write one report per player and the class summary; returns the StudentReports and the summary path.
+
+    Each student is rendered in a worker process with its own read-only
+    connection, so SQLite reads, the per-fact tallies and PDF layout all run
+    in parallel; only the small per-fact totals come back for the summary.
+    """
+    if players is None:
+        reader = HistoryReader(history_path)
+        players = reader.players()
+        reader.close()
+    os.makedirs(directory, exist_ok=True)
+    names = file_names(players)
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(history_path, format)) as pool:
+        futures = [pool.submit(export_student, player, names[player], directory, format, since)
+                   for player in players]
+        reports = [future.result() for future in futures]
+        summary = pool.submit(export_class, reports, directory, format).result()
+    return reports, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rapoarte pentru toata clasa, din istoricul salvat")
+    parser.add_argument("--history", default=DEFAULT_PATH, help="fisierul de istoric")
+    parser.add_argument("--players", nargs="+", help="doar acesti elevi (implicit toti din istoric)")
+    parser.add_argument("--output", default=REPORT_DIR, help="dosarul pentru rapoarte")
+    parser.add_argument("--format", choices=[FORMAT_HTML, FORMAT_PDF], default=FORMAT_HTML)
+    parser.add_argument("--since", metavar="ZZ.LL.AAAA", help="doar sesiunile incepute de la aceasta data")
+    parser.add_argument("--workers", type=int, help="procese in paralel (implicit cate nuclee are calculatorul)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.history):
+        sys.exit(f"Nu exista istoricul {args.history}")
+    since = 0.0
+    if args.since:
+        try:
+            since = time.mktime(time.strptime(args.since, "%d.%m.%Y"))
+        except ValueError:
+            sys.exit(f"Data {args.since} nu are forma ZZ.LL.AAAA")
+
+    started = time.perf_counter()
+    reports, summary = export_reports(args.history, args.output, args.players, args.format, args.workers, since)
+    for report in reports:
+        print(f"{report.player or UNNAMED}: {report.sessions} sesiuni, "
+              f"scor {report.score}/{report.questions}, {report.repeated} greseli repetate")
+    print(f"{len(reports)} rapoarte si {summary} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
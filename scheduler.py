@@ -0,0 +1,102 @@
+import heapq
+import random
+from itertools import count
+
+
+MODE_UNIFORM = "uniform"
+MODE_ADAPTIVE = "adaptive"
+
+# Leitner boxes: how many questions later a fact in each box is due again
+INTERVALS = (3, 6, 12, 25, 50, 100)
+SLOW_MS = 5000  # a correct answer slower than this does not promote the fact
+
+
+class SpacedRepetitionScheduler:
+    """Picks the next fact with a Leitner-style priority queue.
+
+    Each fact sits in a box. A wrong answer sends it back to box 0, a quick
+    correct answer moves it up one box, and the box decides how many questions
+    pass before the fact is due again. Facts wait in a heap keyed by due tick;
+    once due they move to a ready heap ordered by box and then weakness (error
+    rate and latency, seeded from the lifetime stats), so missed facts come
+    back first. Picking and recording are heap operations, O(log n).
+    """
+
+    def __init__(self, facts, fact_stats=None, seed=None):
+        self.seed = seed  # written to the event log of every session it schedules
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.sequence = count()
+        self.boxes = {}
+        self.weakness = {}
+        self.last_fact = None
+
+        fact_stats = fact_stats or {}
+        order = list(facts)
+        self.rng.shuffle(order)  # random order among equally weak facts
+        self.ready = []
+        for fact in order:
+            stats = fact_stats.get(fact)
+            self.boxes[fact] = self.initial_box(stats)
+            self.weakness[fact] = self.initial_weakness(stats)
+            self.ready.append(self.ready_entry(fact))
+        heapq.heapify(self.ready)
+        self.waiting = []
+
+    @staticmethod
+    def initial_box(stats):
+        if stats is None or not stats.attempts:
+            return 0
+        accuracy = 1 - stats.errors / stats.attempts
+        box = int(accuracy * (len(INTERVALS) - 2))
+        if stats.mean_latency_ms > SLOW_MS:
+            box -= 1
+        return max(0, box)
+
+    @staticmethod
+    def initial_weakness(stats):
+        if stats is None or not stats.attempts:
+            return 0.5  # unseen facts rank between known and weak ones
+        return stats.errors / stats.attempts + min(stats.mean_latency_ms / SLOW_MS, 1.0) / 2
+
+    def ready_entry(self, fact):
+        return (self.boxes[fact], -self.weakness[fact], next(self.sequence), fact)
+
+    def next_fact(self):
+        """Pop the most urgent due fact, avoiding the same fact twice in a row."""
+        self.tick += 1
+        while self.waiting and self.waiting[0][0] <= self.tick:
+            fact = heapq.heappop(self.waiting)[2]
+            heapq.heappush(self.ready, self.ready_entry(fact))
+
+        # Nothing due yet: take whichever fact is due soonest
+        if not self.ready and self.waiting:
+            fact = heapq.heappop(self.waiting)[2]
+            heapq.heappush(self.ready, self.ready_entry(fact))
+
+        entry = heapq.heappop(self.ready)
+        if entry[3] == self.last_fact:
+            if not self.ready and self.waiting:
+                fact = heapq.heappop(self.waiting)[2]
+                heapq.heappush(self.ready, self.ready_entry(fact))
+            if self.ready:
+                entry = heapq.heapreplace(self.ready, entry)
+        self.last_fact = entry[3]
+        return self.last_fact
+
+    def record(self, fact, correct, latency_ms):
+        """Move `fact` between boxes and schedule it again."""
+        box = self.boxes[fact]
+        if not correct:
+            box = 0
+            self.weakness[fact] = min(1.0, self.weakness[fact] + 0.25)
+        else:
+            if latency_ms <= SLOW_MS:
+                box = min(box + 1, len(INTERVALS) - 1)
+            self.weakness[fact] *= 0.75
+        self.boxes[fact] = box
+        heapq.heappush(self.waiting, (self.tick + INTERVALS[box], next(self.sequence), fact))
+
+    def release(self, fact):
+        """Return a fact that was picked but never answered to the ready queue."""
+        heapq.heappush(self.ready, self.ready_entry(fact))
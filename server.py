@@ -0,0 +1,301 @@
+import argparse
+import asyncio
+import json
+from itertools import count
+
+from deck import MAX_TABLE_SIZE, table_facts
+from history import HistoryStore
+from quiz_engine import MAX_ANSWER, QuizEngine, SessionSettings
+from scheduler import MODE_ADAPTIVE, MODE_UNIFORM, SpacedRepetitionScheduler
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_LINE = 4096  # longest accepted request, in bytes
+BACKLOG = 1024  # a whole school connecting at once
+WATCHER_BUFFER_LIMIT = 256 * 1024  # a dashboard further behind than this is dropped
+
+
+# ---------------- Protocol ----------------
+# One JSON object per line, in both directions. Every message has a "type".
+#
+# Student:  start {total_questions, tables, max_operand, mode, player} -> started {session_id}
+#           next                        -> question {number, a, b, choices, total} or summary
+#           answer {choice} or {value}  -> result {correct, correct_answer, score, feedback}
+#           stop                        -> summary {score, total, percentage, elapsed, mistakes, latencies}
+# Teacher:  watch                       -> roster {students}, then a score message per change
+# Errors:   error {message}; the connection stays open.
+
+def encode(message):
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line):
+    message = json.loads(line)
+    if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+        raise ValueError("message must be an object with a type")
+    return message
+
+
+def settings_from_message(message):
+    """SessionSettings from a start message, validated like the start menu does."""
+    defaults = SessionSettings()
+    total = message.get("total_questions", defaults.total_questions)
+    tables = message.get("tables", defaults.tables)
+    max_operand = message.get("max_operand", defaults.max_operand)
+    mode = message.get("mode", defaults.mode)
+
+    if total is not None and (type(total) is not int or total < 1):
+        raise ValueError("total_questions must be a positive integer or null")
+    if (not isinstance(tables, list) and not isinstance(tables, tuple)) or not tables \
+            or any(type(t) is not int or not 1 <= t <= MAX_TABLE_SIZE for t in tables):
+        raise ValueError(f"tables must be a list of integers between 1 and {MAX_TABLE_SIZE}")
+    if type(max_operand) is not int or not 1 <= max_operand <= MAX_TABLE_SIZE:
+        raise ValueError(f"max_operand must be between 1 and {MAX_TABLE_SIZE}")
+    if mode not in (MODE_UNIFORM, MODE_ADAPTIVE):
+        raise ValueError(f"mode must be {MODE_UNIFORM} or {MODE_ADAPTIVE}")
+    return defaults._replace(total_questions=total, tables=tuple(tables), max_operand=max_operand, mode=mode)
+
+
+def question_message(question, total):
+    return {"type": "question", "number": question.number, "a": question.a, "b": question.b,
+            "choices": question.choices, "total": total}
+
+
+def summary_message(summary):
+    return {
+        "type": "summary",
+        "score": summary.score,
+        "total": summary.total,
+        "percentage": summary.percentage,
+        "elapsed": summary.elapsed_time,
+        "mistakes": [{"a": m.a, "b": m.b, "count": m.count, "answers": m.user_answers} for m in summary.mistakes],
+        "latencies": [{"a": a, "b": b, "mean_ms": round(mean_ms)}
+                      for (a, b), mean_ms in summary.answers.fact_latencies().items()],
+    }
+
+
+# ---------------- Sessions ----------------
+class Session:
+    """One connected student: a quiz engine plus what the server needs to report on it."""
+
+    __slots__ = ("id", "player", "engine", "history_id", "finished")
+
+    def __init__(self, session_id, player, engine, history_id):
+        self.id = session_id
+        self.player = player
+        self.engine = engine
+        self.history_id = history_id
+        self.finished = False
+
+    def status(self):
+        return {"type": "score", "session_id": self.id, "player": self.player, "score": self.engine.score,
+                "answered": len(self.engine.answers), "total": self.engine.total_questions,
+                "finished": self.finished}
+
+
+class ClassroomServer:
+    """Hosts many quiz sessions on one asyncio event loop.
+
+    Each connection runs its own QuizEngine, so questions and scoring follow
+    exactly the same rules as the desktop quiz. Engine calls take microseconds
+    and history writes only enqueue rows for the history writer thread; the
+    one blocking read (lifetime stats for adaptive mode) runs in an executor,
+    so no session ever stalls the loop. Fact lists and distractor indexes are
+    shared between sessions on the same tables, which keeps a session to its
+    answer log and a shuffled deck.
+    """
+
+    def __init__(self, history=None):
+        self.history = history
+        self.session_ids = count(1)
+        self.sessions = {}
+        self.watchers = set()
+        self.server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE, backlog=BACKLOG)
+        return self.server
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        host, port = self.address
+        print(f"Serverul asculta pe {host}:{port}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    @property
+    def address(self):
+        return self.server.sockets[0].getsockname()[:2]
+
+    # ---------------- Connections ----------------
+    async def handle_connection(self, reader, writer):
+        connection = {"session": None, "writer": writer}
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(encode({"type": "error", "message": "message too long"}))
+                    break
+                if not line:
+                    break
+                try:
+                    message = decode(line)
+                    handler = self.handlers.get(message["type"])
+                    if handler is None:
+                        raise ValueError(f"unknown message type: {message['type']}")
+                    reply = await handler(self, connection, message)
+                except ValueError as error:
+                    reply = {"type": "error", "message": str(error)}
+                if reply is not None:
+                    writer.write(encode(reply))
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.end_session(connection)
+            self.watchers.discard(writer)
+            writer.close()
+
+    def end_session(self, connection):
+        session = connection["session"]
+        if session is None:
+            return
+        connection["session"] = None
+        self.sessions.pop(session.id, None)
+        if not session.finished:
+            session.engine.release_question()
+            if self.history:
+                self.history.abandon_session(session.history_id)
+            self.broadcast({"type": "left", "session_id": session.id})
+
+    # ---------------- Student Messages ----------------
+    async def on_start(self, connection, message):
+        settings = settings_from_message(message)
+        player = str(message.get("player", ""))[:64]
+        self.end_session(connection)
+
+        scheduler = None
+        facts = table_facts(settings.tables, settings.max_operand)
+        engine = QuizEngine(settings.total_questions, facts=facts)
+        if settings.mode == MODE_ADAPTIVE:
+            stats = {}
+            if self.history:
+                stats = await asyncio.get_running_loop().run_in_executor(None, self.history.fact_stats, player)
+            scheduler = SpacedRepetitionScheduler(engine.facts, stats, engine.draw_seed())
+            engine.set_scheduler(scheduler)
+
+        history_id = None
+        if self.history:
+            history_id = self.history.begin_session(player, settings.total_questions or 0)
+        session = Session(next(self.session_ids), player, engine, history_id)
+        self.sessions[session.id] = session
+        connection["session"] = session
+        self.broadcast(session.status())
+        return {"type": "started", "session_id": session.id}
+
+    async def on_next(self, connection, message):
+        session = self.current_session(connection)
+        engine = session.engine
+        if engine.question is not None and not engine.answered:
+            raise ValueError("answer the current question first")
+        question = engine.new_question()
+        if question is None:
+            return self.finish(session)
+        return question_message(question, engine.total_questions)
+
+    async def on_answer(self, connection, message):
+        session = self.current_session(connection)
+        engine = session.engine
+        question = engine.question
+        if session.finished or question is None or engine.answered:
+            raise ValueError("no question waiting for an answer")
+
+        if "choice" in message:
+            index = message["choice"]
+            if type(index) is not int or not 0 <= index < len(question.choices):
+                raise ValueError("choice out of range")
+            correct = engine.check_answer(index)
+        else:
+            value = message.get("value")
+            if type(value) is not int or not 0 <= value <= MAX_ANSWER:
+                raise ValueError(f"value must be an integer between 0 and {MAX_ANSWER}")
+            correct = engine.submit_answer(value)
+
+        if self.history:
+            answers = engine.answers
+            self.history.record_answer(session.history_id, question.a, question.b,
+                                       answers.user_answer[-1], correct, answers.latency_ms[-1])
+        engine.prefetch()
+        self.broadcast(session.status())
+        return {"type": "result", "correct": correct, "correct_answer": question.correct,
+                "score": engine.score, "feedback": engine.feedback_message(correct)}
+
+    async def on_stop(self, connection, message):
+        session = self.current_session(connection)
+        session.engine.stop()
+        return self.finish(session)
+
+    def current_session(self, connection):
+        session = connection["session"]
+        if session is None:
+            raise ValueError("send start first")
+        return session
+
+    def finish(self, session):
+        engine = session.engine
+        if not session.finished:
+            session.finished = True
+            engine.update_elapsed()
+            if self.history:
+                self.history.finish_session(session.history_id, engine.score, engine.elapsed_time)
+            self.broadcast(session.status())
+        return summary_message(engine.summary())
+
+    # ---------------- Teacher Dashboard ----------------
+    async def on_watch(self, connection, message):
+        self.watchers.add(connection["writer"])
+        return {"type": "roster", "students": [session.status() for session in self.sessions.values()]}
+
+    def broadcast(self, message):
+        if not self.watchers:
+            return
+        data = encode(message)
+        for writer in list(self.watchers):
+            # Never wait on a slow dashboard; drop it once its backlog gets too large
+            if writer.transport.get_write_buffer_size() > WATCHER_BUFFER_LIMIT:
+                self.watchers.discard(writer)
+                writer.close()
+            else:
+                writer.write(data)
+
+    handlers = {
+        "start": on_start,
+        "next": on_next,
+        "answer": on_answer,
+        "stop": on_stop,
+        "watch": on_watch,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server pentru clasa: multe teste de tabla inmultirii deodata")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--no-history", action="store_true", help="nu salva sesiunile in istoric")
+    args = parser.parse_args()
+
+    history = None if args.no_history else HistoryStore()
+    server = ClassroomServer(history)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if history:
+            history.close()
+
+
+if __name__ == "__main__":
+    main()
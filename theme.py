@@ -0,0 +1,146 @@
+import os
+from collections import namedtuple
+
+from PyQt6.QtGui import QColor, QFont, QPalette
+from PyQt6.QtWidgets import QApplication
+
+
+FONT_FAMILY = "Helvetica"
+
+# Palette roles the screens draw their text with, set once per widget with
+# setForegroundRole(); switching between them needs no stylesheet parse.
+ROLE_TEXT = QPalette.ColorRole.WindowText  # regular text
+ROLE_SOFT = QPalette.ColorRole.BrightText  # question, score and praise
+ROLE_ERROR = QPalette.ColorRole.Link  # mistakes and warnings
+
+# ThemedButton variants
+BUTTON_PRIMARY = "primary"
+BUTTON_SECONDARY = "secondary"
+BUTTON_LIGHT = "light"
+BUTTON_DANGER = "danger"
+BUTTON_TOGGLE = "toggle"
+
+ButtonColors = namedtuple("ButtonColors", "background text hover_background hover_text checked_background checked_text")
+
+
+class Theme:
+    """Every color one look of the app uses.
+
+    Colors are QColor objects built once, and the QPalette is built on first
+    use; applying a theme swaps the application palette, and the custom
+    painted widgets read their colors from here on their next paint.
+    """
+
+    def __init__(self, name, label, text, soft, error, background, heart, heart_text, input_background, buttons):
+        self.name = name
+        self.label = label  # shown on the menu
+        self.text = QColor(text)
+        self.soft = QColor(soft)
+        self.error = QColor(error)
+        self.background = tuple(map(QColor, background))  # gradient top, bottom
+        self.heart = tuple(map(QColor, heart))  # normal, hovered
+        self.heart_text = tuple(map(QColor, heart_text))
+        self.input_background = QColor(input_background)
+        self.buttons = {}
+        for variant, colors in buttons.items():
+            colors = tuple(map(QColor, colors))
+            self.buttons[variant] = ButtonColors(*(colors if len(colors) == 6 else colors + colors[:2]))
+        self.cached_palette = None
+
+    def palette(self):
+        if self.cached_palette is None:
+            palette = QPalette()
+            light = self.buttons[BUTTON_LIGHT]
+            for role, color in ((QPalette.ColorRole.Window, self.background[0]),
+                                (ROLE_TEXT, self.text),
+                                (ROLE_SOFT, self.soft),
+                                (ROLE_ERROR, self.error),
+                                (QPalette.ColorRole.Base, self.input_background),
+                                (QPalette.ColorRole.AlternateBase, self.input_background),
+                                (QPalette.ColorRole.Text, self.text),
+                                (QPalette.ColorRole.PlaceholderText, self.text),
+                                (QPalette.ColorRole.Button, light.background),
+                                (QPalette.ColorRole.ButtonText, self.text),
+                                (QPalette.ColorRole.Highlight, self.buttons[BUTTON_SECONDARY].background),
+                                (QPalette.ColorRole.HighlightedText, self.buttons[BUTTON_SECONDARY].text),
+                                (QPalette.ColorRole.ToolTipBase, self.input_background),
+                                (QPalette.ColorRole.ToolTipText, self.text)):
+                palette.setColor(role, color)
+            self.cached_palette = palette
+        return self.cached_palette
+
+    def button(self, variant):
+        return self.buttons[variant]
+
+
+THEMES = {theme.name: theme for theme in (
+    Theme("roz", "Roz",
+          text="#5A375A", soft="#FFC1CC", error="#C2185B",
+          background=("#F48FB1", "#F06292"),
+          heart=("#ED1F64", "#FFC1CC"), heart_text=("#FFFFFF", "#000000"),
+          input_background="#FFF9FB",
+          buttons={
+              BUTTON_PRIMARY: ("#ED1F64", "#FFFFFF", "#FFC1CC", "#000000"),
+              BUTTON_SECONDARY: ("#9C27B0", "#FFFFFF", "#AB47BC", "#FFFFFF"),
+              BUTTON_LIGHT: ("#FFF9FB", "#000000", "#FFE6F0", "#000000"),
+              BUTTON_DANGER: ("#E57373", "#FFFFFF", "#EF5350", "#FFFFFF"),
+              BUTTON_TOGGLE: ("#FFF9FB", "#5A375A", "#FFE6F0", "#5A375A", "#9C27B0", "#FFFFFF"),
+          }),
+    Theme("linistit", "Linistit",
+          text="#1F3A4D", soft="#0D47A1", error="#B23A48",
+          background=("#B3E5FC", "#81D4FA"),
+          heart=("#26A69A", "#B2DFDB"), heart_text=("#FFFFFF", "#1F3A4D"),
+          input_background="#F5FBFF",
+          buttons={
+              BUTTON_PRIMARY: ("#26A69A", "#FFFFFF", "#B2DFDB", "#1F3A4D"),
+              BUTTON_SECONDARY: ("#3F51B5", "#FFFFFF", "#5C6BC0", "#FFFFFF"),
+              BUTTON_LIGHT: ("#F5FBFF", "#1F3A4D", "#E1F5FE", "#1F3A4D"),
+              BUTTON_DANGER: ("#E57373", "#FFFFFF", "#EF5350", "#FFFFFF"),
+              BUTTON_TOGGLE: ("#F5FBFF", "#1F3A4D", "#E1F5FE", "#1F3A4D", "#3F51B5", "#FFFFFF"),
+          }),
+    Theme("contrast", "Contrast",
+          text="#FFFFFF", soft="#FFEB3B", error="#FF5252",
+          background=("#000000", "#000000"),
+          heart=("#FFEB3B", "#FFFFFF"), heart_text=("#000000", "#000000"),
+          input_background="#222222",
+          buttons={
+              BUTTON_PRIMARY: ("#FFEB3B", "#000000", "#FFFFFF", "#000000"),
+              BUTTON_SECONDARY: ("#FFFFFF", "#000000", "#FFEB3B", "#000000"),
+              BUTTON_LIGHT: ("#333333", "#FFFFFF", "#555555", "#FFFFFF"),
+              BUTTON_DANGER: ("#FF5252", "#000000", "#FF8A80", "#000000"),
+              BUTTON_TOGGLE: ("#333333", "#FFFFFF", "#555555", "#FFFFFF", "#FFEB3B", "#000000"),
+          }),
+)}
+DEFAULT_THEME = os.environ.get("TABLA_THEME", "roz")
+
+_current = THEMES.get(DEFAULT_THEME, THEMES["roz"])
+_fonts = {}
+
+
+def current_theme():
+    return _current
+
+
+def set_theme(name):
+    """Switch every open screen to theme `name` by swapping the application palette."""
+    global _current
+    _current = THEMES[name]
+    app = QApplication.instance()
+    if app is not None:
+        app.setPalette(_current.palette())
+    return _current
+
+
+def apply_theme(app):
+    # Fusion draws inputs, tables and scroll bars from the palette alone
+    app.setStyle("Fusion")
+    app.setPalette(_current.palette())
+
+
+def font(size, bold=False):
+    """Shared QFont for a point size; every widget using that size copies the same font."""
+    key = (size, bold)
+    cached = _fonts.get(key)
+    if cached is None:
+        cached = _fonts[key] = QFont(FONT_FAMILY, size, QFont.Weight.Bold if bold else QFont.Weight.Normal)
+    return cached